@@ -130,9 +130,9 @@ class DotsRuntimeContext:
     global_home: str
     git_url: str | None
     target_branch: str
-    global_pre_command: str | None
-    global_post_command: str | None
-    global_build_command: str | None
+    global_pre_command: str | dict[str, str] | None
+    global_post_command: str | dict[str, str] | None
+    global_build_command: str | dict[str, str] | None
     hook_cwd: str | None
     dry_run: bool
 
@@ -253,15 +253,21 @@ def _should_overwrite_installed_dot(cli: Any, dot: str, new_owner: str | None, n
     return False
 
 
-def _deploy_dot(cli: Any, context: DotsRuntimeContext, dot: str, pkg_path: str) -> None:
-    if not _should_overwrite_installed_dot(cli, dot, *(_read_dot_manifest(cli, pkg_path) or (None, None))):
+def _deploy_dots(cli: Any, context: DotsRuntimeContext, dot_to_pkg: dict[str, str], dots: list[str]) -> None:
+    # Confirm overwrites up front so one _do_install call can extract every bundle concurrently.
+    pkg_paths = [
+        dot_to_pkg[dot]
+        for dot in dots
+        if _should_overwrite_installed_dot(cli, dot, *(_read_dot_manifest(cli, dot_to_pkg[dot]) or (None, None)))
+    ]
+    if not pkg_paths:
         return
     _run_global_action(
         cli,
         context,
-        f"Installing new '{dot}'...",
+        "Installing selected dots...",
         cli._do_install,
-        [pkg_path],
+        pkg_paths,
         context.dry_run,
         prechecked_dependencies=True,
         uninstall_existing=True,
@@ -385,9 +391,7 @@ def execute(cli: Any) -> None:
         if missing_dots:
             UI.error(f"Deploy failed: bundling failed for selected dots: {', '.join(missing_dots)}.")
             raise SystemExit(1)
-        for dot in selected_sections:
-            pkg_path = dot_to_pkg.get(dot)
-            _deploy_dot(cli, context, dot, pkg_path)
+        _deploy_dots(cli, context, dot_to_pkg, selected_sections)
         if hook_runner is not None:
             LOG.debug(f"Running global post_command: {context.global_post_command}")
             hook_runner.execute_commands([context.global_post_command], cwd=cli.source_dir)
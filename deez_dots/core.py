@@ -2,33 +2,53 @@ from __future__ import annotations
 
 import argparse
 import errno
+import functools
 import hashlib
+import json
 import logging
 import os
+import pickle
 import shutil
+import stat
 import subprocess
 import sys
 import re
+import shlex
 import tarfile
 import tempfile
 import time
 import urllib.parse
 import urllib.request
 import zipfile
+from collections import ChainMap
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
 from datetime import datetime
 from fnmatch import fnmatchcase
 from itertools import zip_longest
 from pathlib import Path, PurePosixPath
-from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Set, Tuple, Union
 
 import tomllib as toml
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
 from .ui import UI
 
 LOG = logging.getLogger("deez-dots")
 LOG.setLevel(logging.NOTSET)
 CLI_VERSION = "v0.1.0"
+# ioctl request number for FICLONE from <linux/fs.h>.
+_FICLONE = 0x40049409
+_COPY_CHUNK = 1 << 30
 
 
 class _AllSectionsRequested:
@@ -38,6 +58,32 @@ class _AllSectionsRequested:
 _ALL_SECTIONS_REQUESTED = _AllSectionsRequested()
 RequestedSections = Optional[Union[List[str], _AllSectionsRequested]]
 RunResult = Tuple[bool, str, str]
+HookCommand = Union[str, Dict[str, str]]
+
+
+_VAR_RE = re.compile(r"\$(\w+|\{[^}]*\})", re.ASCII)
+_SHELL_METACHARACTERS = frozenset("|&;<>()$`\\*?[]{}~#\n")
+
+
+def _split_command(command: str) -> Optional[List[str]]:
+    """Split a command into argv, or return None when it relies on shell syntax."""
+    if _SHELL_METACHARACTERS.intersection(command):
+        return None
+    try:
+        argv = shlex.split(command)
+    except ValueError:
+        return None
+    if not argv or "=" in argv[0]:
+        return None
+    return argv
+
+
+def _describe_command(cmd: Optional[HookCommand]) -> str:
+    """Render a hook command for messages, naming the shell when one is forced."""
+    if isinstance(cmd, dict):
+        command = str(cmd.get("command") or "").strip()
+        return f"{command} (via {cmd['shell']})" if cmd.get("shell") else command
+    return str(cmd or "").strip()
 
 
 def _normalize_command(cmd: Union[str, List[str], Tuple[str, ...]], shell: bool = False) -> Union[str, List[str]]:
@@ -48,6 +94,31 @@ def _normalize_command(cmd: Union[str, List[str], Tuple[str, ...]], shell: bool
     return cmd
 
 
+@functools.lru_cache(maxsize=None)
+def _path_executables(search_path: Tuple[str, ...]) -> frozenset[str]:
+    executables = set()
+    for directory in search_path:
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_file() and entry.stat().st_mode & 0o111:
+                            executables.add(entry.name)
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+    return frozenset(executables)
+
+
+def _on_path(name: str) -> bool:
+    if not name:
+        return False
+    if os.sep in name:
+        return shutil.which(name) is not None
+    return name in _path_executables(tuple(os.get_exec_path()))
+
+
 def _normalize_description(value: Any) -> str:
     if not isinstance(value, str):
         return ""
@@ -132,14 +203,19 @@ def default_run_command(
     shell: bool = False,
     cwd: Optional[Union[str, Path]] = None,
     capture_output: bool = True,
+    capture_stdout: bool = True,
     text: bool = True,
     stream_output: bool = False,
     passthrough_output: bool = False,
     retries: int = 1,
     check: bool = False,
 ) -> RunResult:
-    """Run a subprocess and normalize its output."""
+    """Run a subprocess and normalize its output; capture_stdout=False discards stdout but keeps stderr."""
     cwd_path = str(cwd) if cwd is not None else None
+    if capture_output and not capture_stdout:
+        output_kwargs: Dict[str, Any] = {"stdout": subprocess.DEVNULL, "stderr": subprocess.PIPE}
+    else:
+        output_kwargs = {"capture_output": capture_output}
     for attempt in range(1, retries + 1):
         try:
             normalized_cmd = _normalize_command(cmd, shell=shell)
@@ -209,7 +285,7 @@ def default_run_command(
                     normalized_cmd,
                     shell=True,
                     cwd=cwd_path,
-                    capture_output=capture_output,
+                    **output_kwargs,
                     text=text,
                     check=False,
                 )
@@ -221,7 +297,7 @@ def default_run_command(
                     normalized_cmd,
                     shell=False,
                     cwd=cwd_path,
-                    capture_output=capture_output,
+                    **output_kwargs,
                     text=text,
                     check=False,
                 )
@@ -245,6 +321,20 @@ def default_run_command(
     return False, "", "unknown error"
 
 
+_OPTIONAL_RUNNER_KWARGS = frozenset({"stream_output", "passthrough_output", "capture_stdout"})
+
+
+def _call_runner(runner: Callable[..., RunResult], *args: Any, **kwargs: Any) -> RunResult:
+    """Call a pluggable runner, dropping optional keywords that a custom runner does not accept."""
+    try:
+        return runner(*args, **kwargs)
+    except TypeError as exc:
+        if "unexpected keyword argument" in str(exc):
+            filtered_kwargs = {k: v for k, v in kwargs.items() if k not in _OPTIONAL_RUNNER_KWARGS}
+            return runner(*args, **filtered_kwargs)
+        raise
+
+
 class DeezUtils:
     """Utility helpers for normalizing config values and dot metadata.
 
@@ -319,33 +409,47 @@ class DeezUtils:
         return datetime.now().strftime("%Y-%m-%dT%H:%M:%S%z")
 
     @staticmethod
-    def expand_env(val: Any) -> Any:
+    def _expansion_env() -> Mapping[str, str]:
+        defaults = {
+            "HOME": DeezUtils.home_dir(),
+            "XDG_CONFIG_HOME": DeezUtils.xdg_config_home(),
+            "XDG_DATA_HOME": DeezUtils.xdg_data_home(),
+            "XDG_CACHE_HOME": DeezUtils.xdg_cache_home(),
+        }
+        return ChainMap(defaults, os.environ)
+
+    @staticmethod
+    def _expand_string(val: str, env: Mapping[str, str]) -> str:
+        if "$" in val:
+            def replace(match: re.Match) -> str:
+                name = match.group(1)
+                if name.startswith("{"):
+                    name = name[1:-1]
+                return env.get(name, match.group(0))
+
+            val = _VAR_RE.sub(replace, val)
+        if not val.startswith("~"):
+            return val
+        if val == "~" or val.startswith("~/"):
+            return (env["HOME"].rstrip("/") + val[1:]) or "/"
+        return os.path.expanduser(val)
+
+    @staticmethod
+    def expand_env(val: Any, env: Optional[Mapping[str, str]] = None) -> Any:
         """Expand environment variables and home-path shortcuts for strings, recursively handling lists, tuples, and dicts."""
         if isinstance(val, str):
-            original_env = {k: os.environ.get(k) for k in ("HOME", "XDG_CONFIG_HOME", "XDG_DATA_HOME", "XDG_CACHE_HOME")}
-            default_home = original_env["HOME"] or str(Path.home())
-            defaults = {
-                "HOME": default_home,
-                "XDG_CONFIG_HOME": original_env["XDG_CONFIG_HOME"] or str(Path(default_home) / ".config"),
-                "XDG_DATA_HOME": original_env["XDG_DATA_HOME"] or str(Path(default_home) / ".local" / "share"),
-                "XDG_CACHE_HOME": original_env["XDG_CACHE_HOME"] or str(Path(default_home) / ".cache"),
-            }
-            os.environ.update(defaults)
-            try:
-                return os.path.expanduser(os.path.expandvars(val))
-            finally:
-                for key, original_value in original_env.items():
-                    if original_value is None:
-                        os.environ.pop(key, None)
-                    else:
-                        os.environ[key] = original_value
+            if "$" not in val and not val.startswith("~"):
+                return val
+            return DeezUtils._expand_string(val, env if env is not None else DeezUtils._expansion_env())
+        if not isinstance(val, (list, tuple, dict)):
+            return val
+        if env is None:
+            env = DeezUtils._expansion_env()
         if isinstance(val, list):
-            return [DeezUtils.expand_env(v) for v in val]
+            return [DeezUtils.expand_env(v, env) for v in val]
         if isinstance(val, tuple):
-            return tuple(DeezUtils.expand_env(v) for v in val)
-        if isinstance(val, dict):
-            return {k: DeezUtils.expand_env(v) for k, v in val.items()}
-        return val
+            return tuple(DeezUtils.expand_env(v, env) for v in val)
+        return {k: DeezUtils.expand_env(v, env) for k, v in val.items()}
 
     @staticmethod
     def expand(val: Any) -> Any:
@@ -427,40 +531,46 @@ class PackageManager:
     """
 
     config_keys: Tuple[str, ...] = ("package_managers", "pm", "package_manager")
-    command_keys: Tuple[str, ...] = ("query", "install", "uninstall", "update")
+    command_keys: Tuple[str, ...] = ("query", "list", "install", "uninstall", "update")
     package_manager_commands: Dict[str, Dict[str, str]] = {
         "pacman": {
             "query": "pacman -Qs",
+            "list": "pacman -Qq",
             "install": "sudo pacman -S",
             "uninstall": "sudo pacman -R",
             "update": "sudo pacman -Syu",
         },
         "yay": {
             "query": "yay -Qs",
+            "list": "yay -Qq",
             "install": "yay -S",
             "uninstall": "yay -R",
             "update": "yay -Syu",
         },
         "paru": {
             "query": "paru -Qs",
+            "list": "paru -Qq",
             "install": "paru -S",
             "uninstall": "paru -R",
             "update": "paru -Syu",
         },
         "dnf": {
             "query": "dnf list installed",
+            "list": "dnf repoquery --installed --queryformat '%{name}\\n'",
             "install": "sudo dnf install",
             "uninstall": "sudo dnf remove",
             "update": "sudo dnf upgrade --refresh",
         },
         "apt": {
             "query": "apt list --installed",
+            "list": "apt list --installed -qq",
             "install": "sudo apt install -y",
             "uninstall": "sudo apt remove -y",
             "update": "sudo apt update && sudo apt upgrade -y",
         },
         "flatpak": {
-            "query": "flatpak list --app --columns application | grep ",
+            "query": "flatpak info",
+            "list": "flatpak list --app --columns=application",
             "install": "flatpak install -y",
             "uninstall": "flatpak uninstall -y",
             "update": "flatpak update -y",
@@ -513,9 +623,13 @@ class PackageManager:
         self.runner = runner
         self.package_manager_commands = {name: commands.copy() for name, commands in type(self).package_manager_commands.items()}
         for name, commands in (custom_commands or {}).items():
-            self.package_manager_commands.setdefault(name, {}).update(commands)
+            manager_commands = self.package_manager_commands.setdefault(name, {})
+            if "query" in commands and "list" not in commands:
+                manager_commands.pop("list", None)
+            manager_commands.update(commands)
         self.available: List[str] = self.available_managers()
         self._sudo_validated = False
+        self._installed_cache: Dict[str, Optional[frozenset[str]]] = {}
 
     @staticmethod
     def _command_requires_sudo(cmd: str) -> bool:
@@ -557,17 +671,19 @@ class PackageManager:
             return False, "", "sudo authentication failed"
         was_paused = UI.pause_loader() if live_output else False
         try:
-            success, out, err = self.runner(
+            success, out, err = _call_runner(
+                self.runner,
                 cmd,
                 shell=True,
                 retries=1,
                 capture_output=not live_output,
+                capture_stdout=False,
                 stream_output=live_output,
                 passthrough_output=live_output,
             )
         finally:
             UI.resume_loader(was_paused)
-        if live_output and not success:
+        if not success and (live_output or not (err or out)):
             return False, "", err or "command exited with a non-zero status"
         return success, out, err
 
@@ -575,18 +691,70 @@ class PackageManager:
         """Return the list of detected package managers available on the system."""
         found: List[str] = []
         for manager in self.package_manager_commands:
-            if shutil.which(manager):
+            if _on_path(manager):
                 found.append(manager)
         LOG.debug("Detected package managers: %s", found)
         return found
 
+    @staticmethod
+    def _parse_installed_listing(output: str) -> frozenset[str]:
+        packages = set()
+        for line in output.splitlines():
+            fields = line.split(None, 1)
+            if not fields:
+                continue
+            package = fields[0].split("/", 1)[0]
+            if package:
+                packages.add(package)
+        return frozenset(packages)
+
+    def installed_packages(self, manager: str) -> Optional[frozenset[str]]:
+        """Return the cached set of packages installed via a manager, or None if it cannot be listed."""
+        if manager in self._installed_cache:
+            return self._installed_cache[manager]
+        list_cmd = self.package_manager_commands.get(manager, {}).get("list")
+        installed: Optional[frozenset[str]] = None
+        if list_cmd:
+            argv = _split_command(list_cmd)
+            if argv is None:
+                success, out, err = self.runner(list_cmd, shell=True, retries=1)
+            else:
+                success, out, err = self.runner(argv, retries=1)
+            if success:
+                installed = self._parse_installed_listing(out)
+                LOG.debug("Listed %d installed packages via %s", len(installed), manager)
+            else:
+                LOG.debug("Package listing failed for %s: %s", manager, err or out)
+        self._installed_cache[manager] = installed
+        return installed
+
+    def prefetch_installed(self, managers: Iterable[str]) -> None:
+        """List installed packages for several managers concurrently to warm the cache."""
+        pending = [
+            manager
+            for manager in dict.fromkeys(managers)
+            if manager not in self._installed_cache and self.package_manager_commands.get(manager, {}).get("list") and _on_path(manager)
+        ]
+        if len(pending) <= 1:
+            for manager in pending:
+                self.installed_packages(manager)
+            return
+        with ThreadPoolExecutor(max_workers=len(pending), thread_name_prefix="deez-list") as pool:
+            list(pool.map(self.installed_packages, pending))
+
     def query_installed(self, manager: str, package: str) -> bool:
         """Query whether a package is installed using the configured manager."""
+        installed = self.installed_packages(manager)
+        if installed is not None:
+            return package in installed
         query_cmd = self.package_manager_commands.get(manager, {}).get("query")
         if not query_cmd:
             return False
-        cmd = f"{query_cmd} {package}"
-        success, out, _ = self.runner(cmd, shell=True, retries=1)
+        argv = _split_command(query_cmd)
+        if argv is None:
+            success, out, _ = self.runner(f"{query_cmd} {shlex.quote(package)}", shell=True, retries=1)
+        else:
+            success, out, _ = self.runner(argv + [package], retries=1)
         return bool(out.strip()) if success else False
 
     def install(self, manager: str, packages: List[str]) -> bool:
@@ -595,7 +763,7 @@ class PackageManager:
         if not install_cmd or not packages:
             LOG.debug("No install command or packages for manager=%s", manager)
             return False
-        if not shutil.which(manager):
+        if not _on_path(manager):
             LOG.debug("Skipping install for %s: manager not present", manager)
             return False
         UI.set_loader_message(f"Installing via {manager}: {', '.join(packages)}")
@@ -605,6 +773,8 @@ class PackageManager:
             LOG.error("Package install failed for %s: %s", manager, err or out)
             UI.error(f"Failed to install packages for {manager}: {err or out}")
         else:
+            self._installed_cache.pop(manager, None)
+            _path_executables.cache_clear()
             LOG.debug("Installed packages for %s: %s", manager, packages)
             UI.success(f"Installed packages for {manager}: {', '.join(packages)}")
         return success
@@ -621,6 +791,8 @@ class PackageManager:
             LOG.error("Update failed for %s: %s", manager, err or out)
             UI.error(f"Update failed for {manager}: {err or out}")
         else:
+            self._installed_cache.pop(manager, None)
+            _path_executables.cache_clear()
             LOG.debug("Updated packages via %s", manager)
             UI.success(f"Updated packages via {manager}")
         return success
@@ -649,31 +821,32 @@ class PackageManager:
         """Filter dependencies to only those applicable to the chosen managers."""
         if filtered_deps is None:
             filtered_deps = {}
+        manager_rank: Dict[str, int] = {}
+        for rank, manager in enumerate(package_manager):
+            manager_rank.setdefault(manager, rank)
         seen_packages: set = set()
         for dep_manager, dep_list in dependency.items():
             if dep_manager == "system":
-                filtered_deps.setdefault("system", [])
-                for package in dep_list:
-                    if package not in seen_packages:
-                        filtered_deps["system"].append(package)
-                        seen_packages.add(package)
-                continue
-            dep_managers = [m.strip() for m in dep_manager.split(",")]
-            for manager in package_manager:
-                if manager in dep_managers:
-                    filtered_deps.setdefault(manager, [])
-                    for package in dep_list:
-                        if package not in seen_packages:
-                            filtered_deps[manager].append(package)
-                            seen_packages.add(package)
+                target_manager = "system"
+            else:
+                # A package listed under "a,b" belongs to whichever manager is preferred in package_manager.
+                matched = [m.strip() for m in dep_manager.split(",") if m.strip() in manager_rank]
+                if not matched:
+                    continue
+                target_manager = min(matched, key=manager_rank.__getitem__)
+            target_packages = filtered_deps.setdefault(target_manager, [])
+            for package in dep_list:
+                if package not in seen_packages:
+                    target_packages.append(package)
+                    seen_packages.add(package)
         return {k: v for k, v in filtered_deps.items() if v}
 
     def fetch_all_deps(self, data: Dict[str, Any]) -> Dict[str, List[str]]:
         """Collect all dependency declarations from config into a deduplicated map."""
-        def add_dep_block(acc: Dict[str, List[str]], dep_block: Any) -> None:
-            merged = DeezUtils.merge_dependency_blocks(dep_block)
-            for manager, packages in merged.items():
-                acc.setdefault(manager, []).extend(packages)
+        def add_dep_block(acc: Dict[str, Dict[str, None]], dep_block: Any) -> None:
+            for block in DeezUtils.normalize_dependency_blocks(dep_block):
+                for manager, packages in block.items():
+                    acc.setdefault(manager, {}).update(dict.fromkeys(packages))
 
         def iter_file_entries(section_data: Dict[str, Any]) -> Iterable[Dict[str, Any]]:
             for file_entry in section_data.get("files", []):
@@ -684,7 +857,8 @@ class PackageManager:
                         if isinstance(nested_entry, dict):
                             yield nested_entry
 
-        all_deps: Dict[str, List[str]] = {}
+        # Insertion-ordered dicts act as ordered sets, so packages are deduplicated as they are added.
+        all_deps: Dict[str, Dict[str, None]] = {}
         add_dep_block(all_deps, data.get("dependency") or data.get("depends"))
         global_config = data.get("global", {}) if isinstance(data, dict) else {}
         add_dep_block(all_deps, global_config.get("dependency") or global_config.get("depends"))
@@ -698,16 +872,7 @@ class PackageManager:
                 add_dep_block(all_deps, section_data.get("dependency") or section_data.get("depends"))
                 for file_entry in iter_file_entries(section_data):
                     add_dep_block(all_deps, file_entry.get("dependency") or file_entry.get("depends"))
-        for manager, pkgs in list(all_deps.items()):
-            seen = set()
-            unique: List[str] = []
-            for pkg in pkgs:
-                if pkg in seen:
-                    continue
-                seen.add(pkg)
-                unique.append(pkg)
-            all_deps[manager] = unique
-        return all_deps
+        return {manager: list(packages) for manager, packages in all_deps.items()}
 
     def collect_dependency_blocks(self, data: Dict[str, Any]) -> List[Dict[str, List[str]]]:
         """Collect normalized dependency blocks from config sections and file entries."""
@@ -815,11 +980,80 @@ class ReadMeta:
     def read_file(self, file_path: Union[str, Path]) -> Dict[str, Any]:
         """Load a TOML config file into a Python dictionary."""
         p = Path(file_path)
-        with p.open("rb") as f:
-            data = toml.load(f)
+        raw = p.read_bytes()
+        cache_path = self._parsed_cache_path(p, raw)
+        data = self._load_parsed_cache(cache_path)
+        if data is not None:
+            LOG.debug("Loaded config from %s (cached parse %s)", p, cache_path.name)
+            return data
+        data = toml.loads(raw.decode("utf-8"))
+        self._store_parsed_cache(cache_path, data)
         LOG.debug("Loaded config from %s", p)
         return data
 
+    @staticmethod
+    def _parsed_cache_path(file_path: Path, raw: bytes) -> Path:
+        # One entry per config path: the path key groups a file's parses, the content digest validates them.
+        path_key = hashlib.blake2b(os.fsencode(file_path.absolute()), digest_size=8).hexdigest()
+        digest = hashlib.blake2b(raw, digest_size=16).hexdigest()
+        return Path(DeezUtils.xdg_cache_home()) / "deez" / "parsed" / f"{path_key}-{digest}"
+
+    @staticmethod
+    def _dump_json(data: Dict[str, Any]) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(data)
+        return json.dumps(data, separators=(",", ":"), allow_nan=False).encode("utf-8")
+
+    @staticmethod
+    def _load_json(payload: bytes) -> Any:
+        if orjson is not None:
+            return orjson.loads(payload)
+        return json.loads(payload)
+
+    @staticmethod
+    def _load_parsed_cache(cache_path: Path) -> Optional[Dict[str, Any]]:
+        for suffix, loader in ((".json", ReadMeta._load_json), (".pkl", pickle.loads)):
+            candidate = cache_path.with_suffix(suffix)
+            try:
+                data = loader(candidate.read_bytes())
+            except FileNotFoundError:
+                continue
+            except Exception:
+                LOG.debug("Ignoring unreadable parsed config cache %s", candidate, exc_info=True)
+                continue
+            if isinstance(data, dict):
+                return data
+        return None
+
+    @staticmethod
+    def _store_parsed_cache(cache_path: Path, data: Dict[str, Any]) -> None:
+        # JSON loads fastest; TOML datetimes and non-finite floats don't survive it, so those configs stay pickled.
+        try:
+            payload = ReadMeta._dump_json(data)
+            if ReadMeta._load_json(payload) != data:
+                raise ValueError("config does not round-trip through JSON")
+            target = cache_path.with_suffix(".json")
+        except (TypeError, ValueError):
+            payload = pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+            target = cache_path.with_suffix(".pkl")
+        try:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            fd, part = tempfile.mkstemp(prefix=target.name, suffix=".part", dir=target.parent)
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(payload)
+                os.replace(part, target)
+            except BaseException:
+                Path(part).unlink(missing_ok=True)
+                raise
+        except Exception:
+            LOG.debug("Failed to write parsed config cache %s", target, exc_info=True)
+            return
+        path_key = cache_path.name.split("-", 1)[0]
+        for stale in target.parent.glob(f"{path_key}-*"):
+            if stale != target and stale.suffix in {".json", ".pkl"}:
+                stale.unlink(missing_ok=True)
+
     @staticmethod
     def _global_include_entries(data: Dict[str, Any]) -> List[str]:
         global_config = data.get("global", {}) if isinstance(data, dict) else {}
@@ -954,14 +1188,22 @@ class ManifestManager:
         def is_table_array(value: Any) -> bool:
             return isinstance(value, list) and all(isinstance(item, dict) for item in value)
 
+        def format_key(key: Any) -> str:
+            key = str(key)
+            return key if re.fullmatch(r"[A-Za-z0-9_-]+", key) else format_scalar(key)
+
         def format_scalar(value: Any, key: str = "") -> str:
             value = normalize_value(value, key)
+            if isinstance(value, dict):
+                # Inline tables keep structured values such as { shell, command } hooks intact.
+                items = ", ".join(f"{format_key(k)} = {format_scalar(v, k)}" for k, v in value.items() if v is not None)
+                return f"{{ {items} }}" if items else "{}"
             if isinstance(value, bool):
                 return "true" if value else "false"
             if isinstance(value, int):
                 return str(value)
-            escaped = str(value).replace("\\", "\\\\").replace('"', '\\"')
-            return f'"{escaped}"'
+            # JSON string escapes are valid TOML basic-string escapes; TOML additionally forbids a raw DEL.
+            return json.dumps(str(value), ensure_ascii=False).replace("\x7f", "\\u007f")
 
         def append_key_value(lines: List[str], key: str, value: Any) -> None:
             if value is None:
@@ -1274,17 +1516,23 @@ class WriteDots:
 
     def execute_commands(
         self,
-        commands: Iterable[str],
+        commands: Iterable[HookCommand],
         cwd: Optional[Union[str, Path]] = None,
         soft_fail: bool = True,
     ) -> None:
-        """Execute a series of shell commands or scripts with optional failure handling."""
+        """Execute commands or scripts, bypassing the shell unless a command needs one."""
         for cmd in commands:
             if not cmd:
                 continue
+            shell_path: Optional[str] = None
+            if isinstance(cmd, dict):
+                shell_path = cmd.get("shell")
+                cmd = cmd.get("command") or ""
+                if not cmd:
+                    continue
             cmd = cmd.strip()
             resolved: Optional[Path] = None
-            if "/" in cmd or cmd.endswith(".py") or cmd.endswith(".sh"):
+            if shell_path is None and ("/" in cmd or cmd.endswith(".py") or cmd.endswith(".sh")):
                 candidate = Path(cmd) if Path(cmd).is_absolute() else Path(cwd or ".") / cmd
                 if candidate.exists():
                     resolved = candidate
@@ -1297,9 +1545,17 @@ class WriteDots:
                 elif resolved and resolved.suffix == ".py":
                     LOG.debug("Executing (python): %s", resolved)
                     success, out, err = self._call_runner([os.sys.executable, str(resolved)], cwd=cwd, stream_output=True, passthrough_output=True)
+                elif shell_path:
+                    LOG.debug("Executing (%s): %s", shell_path, cmd)
+                    success, out, err = self._call_runner([shell_path, "-c", cmd], cwd=cwd, stream_output=True, passthrough_output=True)
                 else:
-                    LOG.debug("Executing (shell): %s", cmd)
-                    success, out, err = self._call_runner(cmd, shell=True, cwd=cwd, stream_output=True, passthrough_output=True)
+                    argv = _split_command(cmd)
+                    if argv is not None and os.sep not in argv[0] and _on_path(argv[0]):
+                        LOG.debug("Executing (direct): %s", cmd)
+                        success, out, err = self._call_runner(argv, cwd=cwd, stream_output=True, passthrough_output=True)
+                    else:
+                        LOG.debug("Executing (shell): %s", cmd)
+                        success, out, err = self._call_runner(cmd, shell=True, cwd=cwd, stream_output=True, passthrough_output=True)
                 if success:
                     continue
                 message = err or out or "command failed"
@@ -1319,13 +1575,7 @@ class WriteDots:
                 UI.resume_loader(was_paused)
 
     def _call_runner(self, *args: Any, **kwargs: Any) -> RunResult:
-        try:
-            return self.runner(*args, **kwargs)
-        except TypeError as exc:
-            if "unexpected keyword argument" in str(exc):
-                filtered_kwargs = {k: v for k, v in kwargs.items() if k not in {"stream_output", "passthrough_output"}}
-                return self.runner(*args, **filtered_kwargs)
-            raise
+        return _call_runner(self.runner, *args, **kwargs)
 
     def _run_sudo_command(self, command: List[str], description: str) -> bool:
         """Run a privileged command via sudo, showing prompts and output."""
@@ -1397,35 +1647,53 @@ class WriteDots:
         version = desc_data.get("version", "unknown")
         dirname = self._backup_dot_dirname(dot, owner, version)
         xdg_data = Path(DeezUtils.xdg_data_home())
-        backup_dir = xdg_data / "deez" / "backup" / "user" / dirname
+        backup_root = xdg_data / "deez" / "backup"
+        backup_dir = backup_root / "user" / dirname
         backup_dir.mkdir(parents=True, exist_ok=True)
+        root_stat = os.stat(backup_root)
+        skip_dir = (root_stat.st_dev, root_stat.st_ino)
+        targets: List[Tuple[Path, str]] = []
+        for entry in file_entries:
+            if isinstance(entry, dict):
+                dst_abs = DeezUtils.expand(entry.get("dst"))
+                action = entry.get("action", "sync")
+            else:
+                dst_abs = DeezUtils.expand(entry)
+                action = "sync"
+            if dst_abs:
+                targets.append((Path(dst_abs), action))
+        fingerprint = self._backup_fingerprint(targets, skip_dir)
+        previous_backup = self._reusable_backup(backup_dir, fingerprint)
+        if previous_backup is not None:
+            LOG.debug("Tracked files for %s unchanged since %s", dot, previous_backup)
+            UI.info(f"Backup unchanged: {previous_backup}")
+            return str(previous_backup)
         ts = DeezUtils.get_timestamp().replace(":", "-")
         tmp_stage = Path(tempfile.mkdtemp(prefix="deez-backup-"))
         try:
             data_dir = tmp_stage / "data"
             data_dir.mkdir(parents=True, exist_ok=True)
             backed_pairs: List[Dict[str, Any]] = []
-            for entry in file_entries:
-                if isinstance(entry, dict):
-                    dst_abs = DeezUtils.expand(entry.get("dst"))
-                    action = entry.get("action", "sync")
-                else:
-                    dst_abs = DeezUtils.expand(entry)
-                    action = "sync"
-                if not dst_abs:
-                    continue
-                dst_path = Path(dst_abs)
-                if not self._path_exists_or_link(dst_path):
+            created_dirs: Set[Path] = set()
+            # Nested targets share a group so overlapping paths are never staged by two threads at once.
+            groups: List[List[int]] = []
+            group_root: Optional[Path] = None
+            for index in sorted(range(len(targets)), key=lambda i: targets[i][0].parts):
+                dst_path = targets[index][0]
+                if group_root is not None and (dst_path == group_root or group_root in dst_path.parents):
+                    groups[-1].append(index)
                     continue
-                rel = dst_path.as_posix().lstrip("/")
-                dest_in_stage = data_dir / rel
-                try:
-                    self._copy_path_to_stage(dst_path, dest_in_stage)
-                except Exception as e:
-                    LOG.warning("Backup failed for %s: %s", dst_abs, e)
-                    continue
-                for f in self._expand_files(dest_in_stage):
-                    data_rel = Path(f).relative_to(data_dir).as_posix()
+                groups.append([index])
+                group_root = dst_path
+            staged_by_index: Dict[int, List[Path]] = {}
+            if groups:
+                with ThreadPoolExecutor(max_workers=min(4, len(groups)), thread_name_prefix="deez-backup") as pool:
+                    futures = [pool.submit(self._stage_backup_group, targets, group, data_dir, skip_dir, created_dirs) for group in groups]
+                    for future in as_completed(futures):
+                        staged_by_index.update(future.result())
+            for index, (dst_path, action) in enumerate(targets):
+                for f in staged_by_index.get(index, []):
+                    data_rel = f.relative_to(data_dir).as_posix()
                     backed_pairs.append({"src": data_rel, "dst": Path(os.sep) / data_rel, "action": action})
             if not backed_pairs:
                 LOG.debug("No files backed up for %s", dot)
@@ -1439,12 +1707,134 @@ class WriteDots:
                 tar.add(data_dir, arcname="data")
             digest = hashlib.sha256(tarball_path.read_bytes()).hexdigest()
             (backup_dir / f"{ts}.sha256").write_text(f"{digest}  {ts}.tar.gz\n")
+            if fingerprint:
+                (backup_dir / "latest.meta").write_text(f"{fingerprint}  {ts}.tar.gz\n")
+            else:
+                (backup_dir / "latest.meta").unlink(missing_ok=True)
             LOG.debug("Backup tarball created: %s", tarball_path)
             UI.info(f"Backup saved: {tarball_path}")
             return str(tarball_path)
         finally:
             shutil.rmtree(tmp_stage, ignore_errors=True)
 
+    def _stage_backup_group(
+        self,
+        targets: List[Tuple[Path, str]],
+        indices: List[int],
+        data_dir: Path,
+        skip_dir: Optional[Tuple[int, int]],
+        created_dirs: Set[Path],
+    ) -> Dict[int, List[Path]]:
+        staged: Dict[int, List[Path]] = {}
+        for index in indices:
+            dst_path = targets[index][0]
+            dest_in_stage = data_dir / dst_path.as_posix().lstrip("/")
+            try:
+                staged[index] = self._backup_path_to_stage(dst_path, dest_in_stage, skip_dir, created_dirs)
+            except Exception as e:
+                LOG.warning("Backup failed for %s: %s", dst_path, e)
+        return staged
+
+    @staticmethod
+    def _walk_scandir(
+        root_path: Union[str, bytes, Path],
+        rel_prefix: Union[str, bytes] = "",
+        skip_dir: Optional[Tuple[int, int]] = None,
+    ) -> Iterator[Tuple[os.DirEntry, Any]]:
+        """Yield (entry, relative path) pairs below root_path without following symlinks; bytes roots yield bytes paths."""
+        root = os.fspath(root_path)
+        sep = os.sep if isinstance(root, str) else os.sep.encode()
+        with os.scandir(root) as entries:
+            for entry in entries:
+                rel = rel_prefix + sep + entry.name if rel_prefix else entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    if skip_dir is not None and entry.inode() == skip_dir[1] and entry.stat(follow_symlinks=False).st_dev == skip_dir[0]:
+                        continue
+                    yield entry, rel
+                    yield from WriteDots._walk_scandir(entry.path, rel, skip_dir)
+                    continue
+                yield entry, rel
+
+    @staticmethod
+    def _stat_signature(rel: str, path_stat: os.stat_result) -> bytes:
+        return f"{rel}\0{path_stat.st_mode}\0{path_stat.st_ino}\0{path_stat.st_size}\0{path_stat.st_mtime_ns}\n".encode("utf-8", "surrogateescape")
+
+    @staticmethod
+    def _backup_fingerprint(targets: List[Tuple[Path, str]], skip_dir: Optional[Tuple[int, int]] = None) -> str:
+        """Hash the lstat metadata of every tracked path so unchanged trees can skip a new backup; return "" if any path cannot be read."""
+        digest = hashlib.sha256()
+        for target, action in targets:
+            digest.update(f"{target}\0{action}\n".encode("utf-8", "surrogateescape"))
+            try:
+                target_stat = WriteDots._lstat_or_none(target)
+                if target_stat is None:
+                    continue
+                digest.update(WriteDots._stat_signature("", target_stat))
+                if stat.S_ISDIR(target_stat.st_mode) and (target_stat.st_dev, target_stat.st_ino) != skip_dir:
+                    for entry, rel in WriteDots._walk_scandir(target, skip_dir=skip_dir):
+                        digest.update(WriteDots._stat_signature(rel, entry.stat(follow_symlinks=False)))
+            except OSError as e:
+                LOG.debug("Cannot fingerprint %s, backup will not be reused: %s", target, e)
+                return ""
+        return digest.hexdigest()
+
+    @staticmethod
+    def _reusable_backup(backup_dir: Path, fingerprint: str) -> Optional[Path]:
+        if not fingerprint:
+            return None
+        try:
+            recorded = (backup_dir / "latest.meta").read_text().split()
+        except OSError:
+            return None
+        if len(recorded) != 2 or recorded[0] != fingerprint:
+            return None
+        tarball = backup_dir / recorded[1]
+        return tarball if tarball.is_file() else None
+
+    @staticmethod
+    def _backup_path_to_stage(
+        source_path: Union[str, Path],
+        staged_path: Union[str, Path],
+        skip_dir: Optional[Tuple[int, int]] = None,
+        created_dirs: Optional[Set[Path]] = None,
+    ) -> List[Path]:
+        source = Path(source_path)
+        staged = Path(staged_path)
+        source_stat = WriteDots._lstat_or_none(source)
+        if source_stat is None or (source_stat.st_dev, source_stat.st_ino) == skip_dir:
+            return []
+        if not stat.S_ISDIR(source_stat.st_mode):
+            if stat.S_ISLNK(source_stat.st_mode):
+                WriteDots._copy_symlink(source, staged, created_dirs)
+            else:
+                WriteDots._ensure_parent_dir(staged, created_dirs)
+                WriteDots._copy_file(source, staged)
+            return [staged]
+        staged.mkdir(parents=True, exist_ok=True)
+        staged_files: List[Path] = []
+        staged_dirs: List[Tuple[str, Path]] = [(str(source), staged)]
+        for entry, rel in WriteDots._walk_scandir(source, skip_dir=skip_dir):
+            target = staged / rel
+            if entry.is_dir(follow_symlinks=False):
+                try:
+                    os.mkdir(target)
+                except FileExistsError:
+                    pass
+                staged_dirs.append((entry.path, target))
+                continue
+            if entry.is_symlink():
+                WriteDots._copy_symlink(entry.path, target)
+            elif entry.is_file(follow_symlinks=False):
+                WriteDots._copy_file(entry.path, target)
+            else:
+                LOG.warning("Skipping special file during backup: %s", entry.path)
+                continue
+            staged_files.append(target)
+        # Apply directory metadata last so read-only modes don't block the copies above.
+        for dir_source, dir_target in reversed(staged_dirs):
+            shutil.copystat(dir_source, dir_target)
+        return staged_files
+
     def _pkg_path(self, dot: str, version: str, out_dir: Optional[Union[str, Path]] = None) -> str:
         safe_ver = (version or "unknown").replace("/", "-")
         base = Path(out_dir) if out_dir else Path.cwd() / "build"
@@ -1491,22 +1881,34 @@ class WriteDots:
                 result.append(str(current_dir / fname))
         return result
 
+    @staticmethod
+    def _lstat_or_none(candidate_path: Union[str, bytes, Path]) -> Optional[os.stat_result]:
+        """Return the lstat result for a path, or None when nothing is there."""
+        try:
+            return os.lstat(candidate_path)
+        except OSError as e:
+            if e.errno in (errno.ENOENT, errno.ENOTDIR):
+                return None
+            raise
+
     @staticmethod
     def _path_exists_or_link(candidate_path: Union[str, Path]) -> bool:
-        candidate = Path(candidate_path)
         try:
-            return candidate.exists() or candidate.is_symlink()
+            return WriteDots._lstat_or_none(candidate_path) is not None
         except OSError:
-            return candidate.is_symlink()
+            return False
 
     @staticmethod
-    def _remove_existing_path(candidate_path: Union[str, Path]) -> None:
+    def _remove_existing_path(candidate_path: Union[str, Path], candidate_stat: Optional[os.stat_result] = None) -> None:
         candidate = Path(candidate_path)
-        if candidate.is_symlink() or candidate.is_file():
-            candidate.unlink()
-            return
-        if candidate.exists():
+        if candidate_stat is None:
+            candidate_stat = WriteDots._lstat_or_none(candidate)
+            if candidate_stat is None:
+                return
+        if stat.S_ISDIR(candidate_stat.st_mode):
             shutil.rmtree(candidate)
+            return
+        candidate.unlink()
 
     @staticmethod
     def _remove_empty_directories(directory_paths: Iterable[Union[str, Path]]) -> None:
@@ -1531,48 +1933,107 @@ class WriteDots:
                     UI.error(f"Failed to remove empty directory {candidate}: {e}")
 
     @staticmethod
-    def _copy_symlink(source_path: Union[str, Path], staged_path: Union[str, Path]) -> None:
+    def _copy_file(source_path: Union[str, bytes, Path], target_path: Union[str, bytes, Path]) -> Union[str, bytes, Path]:
+        """Copy a file with data and metadata, preferring reflinks and in-kernel copies."""
+        source_stat = os.stat(source_path)
+        if not stat.S_ISREG(source_stat.st_mode):
+            raise shutil.SpecialFileError(f"{source_path!r} is not a regular file")
+        try:
+            target_stat = os.stat(target_path)
+        except OSError:
+            target_stat = None
+        if target_stat is not None:
+            if os.path.samestat(source_stat, target_stat):
+                raise shutil.SameFileError(f"{source_path!r} and {target_path!r} are the same file")
+            if stat.S_ISFIFO(target_stat.st_mode):
+                raise shutil.SpecialFileError(f"{target_path!r} is a named pipe")
+        with open(source_path, "rb") as src, open(target_path, "wb") as dst:
+            src_fd = src.fileno()
+            dst_fd = dst.fileno()
+            copied = False
+            if fcntl is not None:
+                try:
+                    fcntl.ioctl(dst_fd, _FICLONE, src_fd)
+                    copied = True
+                except OSError:
+                    pass
+            copy_file_range = getattr(os, "copy_file_range", None)
+            if not copied and copy_file_range is not None:
+                try:
+                    while copy_file_range(src_fd, dst_fd, _COPY_CHUNK):
+                        pass
+                    copied = True
+                except OSError:
+                    pass
+            if not copied:
+                # Both offsets advance together, so the fallback resumes where the kernel stopped.
+                shutil.copyfileobj(src, dst)
+        shutil.copystat(source_path, target_path)
+        return target_path
+
+    @staticmethod
+    def _copy_tree(source_path: Union[str, Path], target_path: Union[str, Path], symlinks: bool = False) -> None:
+        shutil.copytree(source_path, target_path, symlinks=symlinks, copy_function=WriteDots._copy_file)
+
+    @staticmethod
+    def _ensure_parent_dir(path: Path, created_dirs: Optional[Set[Path]] = None) -> None:
+        parent = path.parent
+        if created_dirs is None:
+            parent.mkdir(parents=True, exist_ok=True)
+        elif parent not in created_dirs:
+            parent.mkdir(parents=True, exist_ok=True)
+            created_dirs.add(parent)
+
+    @staticmethod
+    def _forget_created_dirs(removed: Path, created_dirs: Optional[Set[Path]]) -> None:
+        if created_dirs:
+            created_dirs.difference_update([d for d in created_dirs if d == removed or removed in d.parents])
+
+    @staticmethod
+    def _copy_symlink(source_path: Union[str, Path], staged_path: Union[str, Path], created_dirs: Optional[Set[Path]] = None) -> None:
         source = Path(source_path)
         staged = Path(staged_path)
-        if staged.exists() or staged.is_symlink():
-            WriteDots._remove_existing_path(staged)
-        staged.parent.mkdir(parents=True, exist_ok=True)
+        staged_stat = WriteDots._lstat_or_none(staged)
+        if staged_stat is not None:
+            WriteDots._remove_existing_path(staged, staged_stat)
+        WriteDots._ensure_parent_dir(staged, created_dirs)
         os.symlink(os.readlink(source), staged)
 
     @staticmethod
     def _copy_path_to_stage(source_path: Union[str, Path], staged_path: Union[str, Path]) -> bool:
         source = Path(source_path)
         staged = Path(staged_path)
-        if not WriteDots._path_exists_or_link(source):
+        source_stat = WriteDots._lstat_or_none(source)
+        if source_stat is None:
             return False
-        if source.is_symlink():
+        if stat.S_ISLNK(source_stat.st_mode):
             WriteDots._copy_symlink(source, staged)
             return True
         staged.parent.mkdir(parents=True, exist_ok=True)
-        if source.is_dir():
-            staged.parent.mkdir(parents=True, exist_ok=True)
-            if staged.exists() or staged.is_symlink():
-                if staged.is_dir():
+        if stat.S_ISDIR(source_stat.st_mode):
+            staged_stat = WriteDots._lstat_or_none(staged)
+            if staged_stat is not None:
+                if stat.S_ISDIR(staged_stat.st_mode):
                     for item in sorted(source.iterdir()):
                         target_item = staged / item.name
-                        if item.is_dir():
+                        item_stat = WriteDots._lstat_or_none(item)
+                        if item_stat is None:
+                            continue
+                        if stat.S_ISDIR(item_stat.st_mode):
                             WriteDots._copy_path_to_stage(item, target_item)
-                        elif item.is_symlink():
-                            if target_item.exists() or target_item.is_symlink():
-                                WriteDots._remove_existing_path(target_item)
-                            target_item.parent.mkdir(parents=True, exist_ok=True)
+                            continue
+                        target_stat = WriteDots._lstat_or_none(target_item)
+                        if target_stat is not None:
+                            WriteDots._remove_existing_path(target_item, target_stat)
+                        if stat.S_ISLNK(item_stat.st_mode):
                             os.symlink(os.readlink(item), target_item)
                         else:
-                            if target_item.exists() or target_item.is_symlink():
-                                WriteDots._remove_existing_path(target_item)
-                            target_item.parent.mkdir(parents=True, exist_ok=True)
-                            shutil.copy2(item, target_item)
+                            WriteDots._copy_file(item, target_item)
                     return True
-                WriteDots._remove_existing_path(staged)
-            shutil.copytree(source, staged, symlinks=True)
+                WriteDots._remove_existing_path(staged, staged_stat)
+            WriteDots._copy_tree(source, staged, symlinks=True)
         else:
-            staged.parent.mkdir(parents=True, exist_ok=True)
-            shutil.copy2(source, staged)
+            WriteDots._copy_file(source, staged)
         return True
 
     @staticmethod
@@ -1804,72 +2265,90 @@ class WriteDots:
         return True
 
     @staticmethod
-    def _copy_with_action(src_path: Union[str, Path], tgt_path: Union[str, Path], action: str, clean_target: bool = False) -> bool:
+    def _copy_with_action(
+        src_path: Union[str, Path],
+        tgt_path: Union[str, Path],
+        action: str,
+        clean_target: bool = False,
+        created_dirs: Optional[Set[Path]] = None,
+    ) -> bool:
         action = DeezUtils.normalize_action(action)
         src = Path(src_path)
         tgt = Path(tgt_path)
-        if src.is_symlink():
-            if action == "preserve" and (tgt.exists() or tgt.is_symlink()):
+        src_stat = WriteDots._lstat_or_none(src)
+        tgt_stat = WriteDots._lstat_or_none(tgt)
+        if src_stat is not None and stat.S_ISLNK(src_stat.st_mode):
+            if action == "preserve" and tgt_stat is not None:
                 return False
-            if tgt.exists() or tgt.is_symlink():
-                if tgt.is_dir() and not tgt.is_symlink() and clean_target:
-                    backup_parent = tgt.parent
-                    backup_name = tgt.name + ".old"
-                    backup_path = backup_parent / backup_name
-                    counter = 1
-                    while backup_path.exists():
-                        backup_path = backup_parent / f"{backup_name}.{counter}"
-                        counter += 1
-                    shutil.move(str(tgt), str(backup_path))
-                    LOG.debug("Clean build: moved existing %s -> %s", tgt, backup_path)
+            if tgt_stat is not None:
+                if stat.S_ISDIR(tgt_stat.st_mode) and clean_target:
+                    WriteDots._move_aside_old(tgt)
                 else:
-                    WriteDots._remove_existing_path(tgt)
-            tgt.parent.mkdir(parents=True, exist_ok=True)
+                    WriteDots._remove_existing_path(tgt, tgt_stat)
+                WriteDots._forget_created_dirs(tgt, created_dirs)
+            WriteDots._ensure_parent_dir(tgt, created_dirs)
             os.symlink(os.readlink(src), tgt)
             return True
-        if src.is_dir():
+        if src_stat is not None and stat.S_ISDIR(src_stat.st_mode):
             if action == "sync":
-                if tgt.exists() and clean_target:
-                    backup_parent = tgt.parent
-                    backup_name = tgt.name + ".old"
-                    backup_path = backup_parent / backup_name
-                    counter = 1
-                    while backup_path.exists():
-                        backup_path = backup_parent / f"{backup_name}.{counter}"
-                        counter += 1
-                    shutil.move(str(tgt), str(backup_path))
-                    LOG.debug("Clean build: moved existing %s -> %s", tgt, backup_path)
-                if not tgt.exists():
-                    shutil.copytree(src, tgt)
+                if tgt_stat is not None and clean_target:
+                    WriteDots._move_aside_old(tgt)
+                    WriteDots._forget_created_dirs(tgt, created_dirs)
+                    tgt_stat = None
+                if tgt_stat is None:
+                    WriteDots._copy_tree(src, tgt)
                     return True
-                for root, _dirs, files in os.walk(src):
-                    rel = os.path.relpath(root, src)
-                    dest_root = tgt if rel == "." else tgt / rel
-                    dest_root.mkdir(parents=True, exist_ok=True)
-                    for fname in files:
-                        shutil.copy2(Path(root) / fname, dest_root / fname)
+                WriteDots._merge_tree(src, tgt, overwrite=True)
                 return True
             if action == "preserve":
-                if not tgt.exists():
-                    shutil.copytree(src, tgt)
+                if tgt_stat is None:
+                    WriteDots._copy_tree(src, tgt)
                     return True
-                for root, _dirs, files in os.walk(src):
-                    rel = os.path.relpath(root, src)
-                    dest_root = tgt if rel == "." else tgt / rel
-                    dest_root.mkdir(parents=True, exist_ok=True)
-                    for fname in files:
-                        dst_file = dest_root / fname
-                        if not dst_file.exists():
-                            shutil.copy2(Path(root) / fname, dst_file)
+                WriteDots._merge_tree(src, tgt, overwrite=False)
                 return True
             return False
-        if action == "preserve" and tgt.exists():
+        if action == "preserve" and tgt_stat is not None:
             return False
-        tgt.parent.mkdir(parents=True, exist_ok=True)
-        shutil.copy2(src, tgt)
+        WriteDots._ensure_parent_dir(tgt, created_dirs)
+        WriteDots._copy_file(src, tgt)
         return True
 
-    def _extract_tarball_payload(self, archive_path: Union[str, Path], destination: Union[str, Path], clean_target: bool = False) -> bool:
+    @staticmethod
+    def _merge_tree(src: Path, tgt: Path, overwrite: bool) -> None:
+        # Work on bytes paths: lstat/scandir/open skip the str -> filesystem encoding step per call.
+        tgt_b = os.fsencode(tgt)
+        os.makedirs(tgt_b, exist_ok=True)
+        for entry, rel in WriteDots._walk_scandir(os.fsencode(src)):
+            target_b = tgt_b + b"/" + rel
+            if entry.is_dir(follow_symlinks=False):
+                os.makedirs(target_b, exist_ok=True)
+                continue
+            if entry.is_dir():
+                # Linked directories are not descended into, matching os.walk's default.
+                continue
+            if not overwrite and WriteDots._lstat_or_none(target_b) is not None:
+                continue
+            WriteDots._copy_file(entry.path, target_b)
+
+    @staticmethod
+    def _move_aside_old(target: Path) -> None:
+        backup_parent = target.parent
+        backup_name = target.name + ".old"
+        backup_path = backup_parent / backup_name
+        counter = 1
+        while WriteDots._path_exists_or_link(backup_path):
+            backup_path = backup_parent / f"{backup_name}.{counter}"
+            counter += 1
+        shutil.move(str(target), str(backup_path))
+        LOG.debug("Clean build: moved existing %s -> %s", target, backup_path)
+
+    def _extract_tarball_payload(
+        self,
+        archive_path: Union[str, Path],
+        destination: Union[str, Path],
+        clean_target: bool = False,
+        created_dirs: Optional[Set[Path]] = None,
+    ) -> bool:
         archive = Path(archive_path)
         destination_path = Path(destination)
         if clean_target and destination_path.exists():
@@ -1894,6 +2373,7 @@ class WriteDots:
                         raise
             else:
                 self._remove_path_sudo(destination_path)
+            self._forget_created_dirs(destination_path, created_dirs)
 
         if not self._is_writable_path(destination_path):
             if not self._run_sudo_command(["mkdir", "-p", str(destination_path)], "create tarball destination directory"):
@@ -2073,9 +2553,9 @@ class WriteDots:
         conflicts: Optional[List[str]] = None,
         compress: bool = True,
         out_dir: Optional[str] = None,
-        pre_command: Optional[str] = None,
-        post_command: Optional[str] = None,
-        build_command: Optional[str] = None,
+        pre_command: Optional[HookCommand] = None,
+        post_command: Optional[HookCommand] = None,
+        build_command: Optional[HookCommand] = None,
         overwrite_existing: bool = False,
     ) -> str:
         """Stage dot files and metadata into a bundle archive, returning the bundle path."""
@@ -2519,10 +2999,8 @@ class GitHandler:
         source_root_path = Path(self.source_cache_path(cache_root, repo_owner, repo_name, target_branch))
         if not source_root_path.exists():
             self.git_clone(git_url, source_root_path, target_branch)
-        if not skip_git:
-            self.git_fetch(source_root_path, target_branch)
-            self.git_pull(source_root_path, target_branch)
-            self.git_checkout(source_root_path, target_branch)
+        elif not skip_git:
+            self.git_sync(source_root_path, target_branch)
         return str(source_root_path)
 
     def prepare_source(
@@ -2634,7 +3112,7 @@ class GitHandler:
         if branch:
             cmd.extend(["--branch", branch])
         cmd.extend([url, str(target_dir)])
-        success, out, err = self.runner(cmd)
+        success, out, err = _call_runner(self.runner, cmd, capture_stdout=False)
         if not success:
             raise RuntimeError(f"git clone failed: {err or out}")
 
@@ -2645,7 +3123,7 @@ class GitHandler:
             cmd = ["git", "-C", str(repo_path), "fetch", "origin", target_branch, "--depth", "1", "--progress"]
         else:
             cmd = ["git", "-C", str(repo_path), "fetch", "--all", "--progress"]
-        success, out, err = self.runner(cmd)
+        success, out, err = _call_runner(self.runner, cmd, capture_stdout=False)
         if not success:
             raise RuntimeError(f"git fetch failed: {err or out}")
 
@@ -2653,17 +3131,28 @@ class GitHandler:
         """Pull the latest changes for a specific branch."""
         LOG.debug("[GIT] pull origin %s (%s)", target_branch, repo_path)
         cmd = ["git", "-C", str(repo_path), "pull", "--rebase", "origin", target_branch, "--progress"]
-        success, out, err = self.runner(cmd)
+        success, out, err = _call_runner(self.runner, cmd, capture_stdout=False)
         if not success:
             raise RuntimeError(f"git pull failed: {err or out}")
 
+    def git_sync(self, repo_path: Union[str, Path], target_branch: str) -> None:
+        """Hard-reset a cached shallow clone to the tip of the remote branch."""
+        LOG.debug("[GIT] fetch --depth 1 origin %s + reset --hard (%s)", target_branch, repo_path)
+        cmd = ["git", "-C", str(repo_path), "fetch", "--depth", "1", "--no-tags", "origin", target_branch]
+        success, out, err = _call_runner(self.runner, cmd, capture_stdout=False)
+        if not success:
+            raise RuntimeError(f"git fetch failed: {err or out}")
+        success, out, err = _call_runner(self.runner, ["git", "-C", str(repo_path), "reset", "--hard", "FETCH_HEAD"], capture_stdout=False)
+        if not success:
+            raise RuntimeError(f"git reset failed: {err or out}")
+
     def git_checkout(self, repo_path: Union[str, Path], branch: str) -> None:
         """Checkout or recreate a branch in a local git repository."""
         LOG.debug("[GIT] checkout %s (%s)", branch, repo_path)
         try:
-            success, out, err = self.runner(["git", "-C", str(repo_path), "checkout", branch])
+            success, out, err = _call_runner(self.runner, ["git", "-C", str(repo_path), "checkout", branch], capture_stdout=False)
             if not success:
-                success2, out2, err2 = self.runner(["git", "-C", str(repo_path), "checkout", "-B", branch, f"origin/{branch}"])
+                success2, out2, err2 = _call_runner(self.runner, ["git", "-C", str(repo_path), "checkout", "-B", branch, f"origin/{branch}"], capture_stdout=False)
                 if not success2:
                     raise RuntimeError(err2 or out2)
         except Exception:
@@ -2698,9 +3187,8 @@ class GitHandler:
             source_root_path = Path(self.source_cache_path(os.getenv("XDG_CACHE_HOME", DeezUtils.xdg_cache_home()), repo_owner, repo_name, safe_branch))
             if not source_root_path.exists():
                 self.git_clone(url, source_root_path, target_branch)
-            self.git_fetch(source_root_path, target_branch)
-            self.git_pull(source_root_path, target_branch)
-            self.git_checkout(source_root_path, target_branch)
+            else:
+                self.git_sync(source_root_path, target_branch)
 
     def get_githash(self, repo_path: Union[str, Path]) -> str:
         """Return the current git HEAD hash for the given repository."""
@@ -2901,14 +3389,14 @@ class DeezCLI:
 
     def _run_scoped_pre_command(
         self,
-        command: Optional[str],
+        command: Optional[HookCommand],
         *,
         scope_label: str,
         cwd: Optional[Union[str, Path]] = None,
     ) -> Optional[str]:
         if not command:
             return None
-        LOG.debug(f"Executing {scope_label} pre_command: {command}")
+        LOG.debug(f"Executing {scope_label} pre_command: {_describe_command(command)}")
         writer = WriteDots()
         try:
             writer.execute_commands([command], cwd=cwd, soft_fail=False)
@@ -2921,7 +3409,7 @@ class DeezCLI:
 
     def _require_pre_command(
         self,
-        command: Optional[str],
+        command: Optional[HookCommand],
         *,
         scope_label: str,
         cwd: Optional[Union[str, Path]] = None,
@@ -2929,12 +3417,12 @@ class DeezCLI:
         failure = self._run_scoped_pre_command(command, scope_label=scope_label, cwd=cwd)
         if failure is None:
             return
-        UI.error(f"{scope_label} pre_command failed: {command}: {failure}")
+        UI.error(f"{scope_label} pre_command failed: {_describe_command(command)}: {failure}")
         raise SystemExit(1)
 
     def _skip_on_failed_pre_command(
         self,
-        command: Optional[str],
+        command: Optional[HookCommand],
         *,
         scope_label: str,
         cwd: Optional[Union[str, Path]] = None,
@@ -2942,14 +3430,14 @@ class DeezCLI:
         failure = self._run_scoped_pre_command(command, scope_label=scope_label, cwd=cwd)
         if failure is None:
             return False
-        UI.warn(f"Skipping {scope_label}: pre_command failed: {command}: {failure}")
+        UI.warn(f"Skipping {scope_label}: pre_command failed: {_describe_command(command)}: {failure}")
         return True
 
     @staticmethod
-    def _announce_dry_run_pre_command(command: Optional[str], *, scope_label: str) -> None:
+    def _announce_dry_run_pre_command(command: Optional[HookCommand], *, scope_label: str) -> None:
         if not command:
             return
-        UI.plain(f"[DRY RUN] Would run {scope_label} pre_command: {command} (assuming success)")
+        UI.plain(f"[DRY RUN] Would run {scope_label} pre_command: {_describe_command(command)} (assuming success)")
 
     @staticmethod
     def _normalize_conflict_names(value: Any) -> List[str]:
@@ -3562,13 +4050,28 @@ class DeezCLI:
         missing: Dict[str, List[str]] = {}
 
         UI.set_loader_message("Checking dependency status...")
+        package_manager = self.package_manager_instance
+        required_managers = [m for m in dependency_map if m != "system"]
+        package_manager.prefetch_installed(required_managers)
+        listings: Optional[Dict[str, frozenset[str]]] = None
         for manager, packages in dependency_map.items():
             for package in packages:
                 installed = False
                 if manager == "system":
-                    installed = bool(shutil.which(package))
+                    installed = _on_path(package)
                 else:
-                    installed = self.package_manager_instance.query_installed(manager, package)
+                    installed = package_manager.query_installed(manager, package)
+                    if not installed:
+                        if listings is None:
+                            # A package may have been installed through another manager; list them all once, concurrently.
+                            present_managers = [m for m in self.available_package_managers if _on_path(m)]
+                            package_manager.prefetch_installed(present_managers)
+                            listings = {}
+                            for present in present_managers:
+                                listing = package_manager.installed_packages(present)
+                                if listing is not None:
+                                    listings[present] = listing
+                        installed = any(package in listing for other, listing in listings.items() if other != manager)
 
                 if installed:
                     satisfied.setdefault(manager, []).append(package)
@@ -4454,6 +4957,38 @@ class DeezCLI:
                 )
         UI.info("Export complete")
 
+    @staticmethod
+    def _extract_bundle(bundle_path: Path) -> Path:
+        temp_install_dir = Path(tempfile.mkdtemp(prefix="deez-install-"))
+        try:
+            with tarfile.open(bundle_path, "r:gz") as tar:
+                tar.extractall(temp_install_dir)
+        except BaseException:
+            shutil.rmtree(temp_install_dir, ignore_errors=True)
+            raise
+        return temp_install_dir
+
+    def _start_bundle_extractions(self, tarballs: List[str]) -> Tuple[Optional[ThreadPoolExecutor], List[Optional[Future]]]:
+        """Extract bundles in the background so installs only wait on their own archive."""
+        bundle_paths = [bundle_path if bundle_path.is_file() else None for bundle_path in map(Path, tarballs)]
+        pending_count = sum(1 for bundle_path in bundle_paths if bundle_path is not None)
+        if not pending_count:
+            return None, [None] * len(bundle_paths)
+        pool = ThreadPoolExecutor(max_workers=min(8, pending_count), thread_name_prefix="deez-extract")
+        return pool, [pool.submit(self._extract_bundle, bundle_path) if bundle_path is not None else None for bundle_path in bundle_paths]
+
+    @staticmethod
+    def _discard_bundle_extractions(pool: Optional[ThreadPoolExecutor], extractions: List[Optional[Future]]) -> None:
+        for future in extractions:
+            if future is None or future.cancel():
+                continue
+            try:
+                shutil.rmtree(future.result(), ignore_errors=True)
+            except Exception:
+                continue
+        if pool is not None:
+            pool.shutdown(wait=True)
+
     def _do_install(self, tarballs: List[str], dry_run: bool = False, prechecked_dependencies: bool = False, uninstall_existing: bool = False) -> None:
         writer = WriteDots()
         no_backup = getattr(self.args, "no_backup", False)
@@ -4472,153 +5007,159 @@ class DeezCLI:
                     continue
                 planned_installs.append((bundle_path, bundle, prepared_bundle))
             self._resolve_bundle_dependencies(planned_installs)
-        for pkg_path in tarballs:
-            bundle_path = Path(pkg_path)
-            UI.set_loader_message(f"Preparing {bundle_path.name}...")
-            UI.set_loader_message(f"Installing {bundle_path.name}...")
-            if not bundle_path.is_file():
-                UI.error(f"Not found: {pkg_path}")
-                continue
-            if dry_run:
-                bundle = self._read_bundle_manifest(bundle_path)
-                if bundle is None:
-                    continue
-                prepared_bundle = self._prepare_bundle_install(bundle_path, bundle, dry_run=dry_run, uninstall_existing=uninstall_existing)
-                if prepared_bundle is None:
-                    continue
-                dot, _bundle_entries, filtered_entries, kept_pairs = prepared_bundle
-                self._announce_dry_run_pre_command(bundle.get("pre_command"), scope_label=f"dot '{dot}'")
-                for file_entry in filtered_entries:
-                    self._announce_dry_run_pre_command(file_entry.get("pre_command"), scope_label=self._file_entry_label(dot, file_entry))
-                UI.plain(f"[DRY RUN] [INSTALL] '{dot}' would be installed ({len(kept_pairs)} files).")
-                continue
-            temp_install_dir = Path(tempfile.mkdtemp(prefix="deez-install-"))
-            try:
-                with tarfile.open(bundle_path, "r:gz") as tar:
-                    tar.extractall(temp_install_dir)
-                manifest_path = temp_install_dir / "manifest.toml"
-                if not manifest_path.exists():
-                    UI.error(f"{pkg_path}: missing manifest.toml")
-                    continue
-                with manifest_path.open("rb") as f:
-                    bundle = toml.load(f)
-                prepared_bundle = self._prepare_bundle_install(bundle_path, bundle, dry_run=dry_run, uninstall_existing=uninstall_existing)
-                if prepared_bundle is None:
-                    continue
-                dot, bundle_entries, filtered_entries, _kept_pairs = prepared_bundle
-                if self._skip_on_failed_pre_command(bundle.get("pre_command"), scope_label=f"dot '{dot}'"):
+        extraction_pool, extractions = self._start_bundle_extractions([] if dry_run else tarballs)
+        try:
+            for index, pkg_path in enumerate(tarballs):
+                bundle_path = Path(pkg_path)
+                UI.set_loader_message(f"Preparing {bundle_path.name}...")
+                UI.set_loader_message(f"Installing {bundle_path.name}...")
+                if not bundle_path.is_file():
+                    UI.error(f"Not found: {pkg_path}")
                     continue
-                install_entries: List[Dict[str, Any]] = []
-                for file_entry in filtered_entries:
-                    if self._skip_on_failed_pre_command(file_entry.get("pre_command"), scope_label=self._file_entry_label(dot, file_entry)):
+                if dry_run:
+                    bundle = self._read_bundle_manifest(bundle_path)
+                    if bundle is None:
+                        continue
+                    prepared_bundle = self._prepare_bundle_install(bundle_path, bundle, dry_run=dry_run, uninstall_existing=uninstall_existing)
+                    if prepared_bundle is None:
                         continue
-                    install_entries.append(file_entry)
-                filtered_entries = install_entries
-                if not filtered_entries:
-                    UI.info(f"'{dot}' skipped — all file entries failed pre_command.")
+                    dot, _bundle_entries, filtered_entries, kept_pairs = prepared_bundle
+                    self._announce_dry_run_pre_command(bundle.get("pre_command"), scope_label=f"dot '{dot}'")
+                    for file_entry in filtered_entries:
+                        self._announce_dry_run_pre_command(file_entry.get("pre_command"), scope_label=self._file_entry_label(dot, file_entry))
+                    UI.plain(f"[DRY RUN] [INSTALL] '{dot}' would be installed ({len(kept_pairs)} files).")
                     continue
-                if not no_backup and dot not in self._backed_up_dots:
-                    installed_entries = self.manifest_manager.get_file_entries(dot)
-                    if installed_entries:
-                        backup_desc = self.manifest_manager.load_desc(dot) or {k: v for k, v in bundle.items() if k != "files"}
-                        backup_path = writer.backup_to_tarball(dot, installed_entries, desc_data=backup_desc)
-                    else:
-                        backup_desc = {k: v for k, v in bundle.items() if k != "files"}
-                        backup_path = writer.backup_to_tarball(dot, filtered_entries, desc_data=backup_desc)
-                    if backup_path:
-                        self._backed_up_dots.add(dot)
-                if uninstall_existing and not dry_run:
-                    self._do_uninstall([dot], dry_run=False, confirm=False, remove_manifest=True)
-                deployed_pairs: List[Dict[str, Any]] = []
-                adopted_pairs: List[Dict[str, Any]] = []
-                bundle_data_dir = temp_install_dir / "data"
-                clean_target = bundle.get("clean_target", False)
-                for file_entry in filtered_entries:
-                    source_rel_path = file_entry.get("src")
-                    destination_path = DeezUtils.expand(file_entry.get("dst"))
-                    destination_path = os.path.normpath(str(destination_path)) if destination_path else ""
-                    entry_action = DeezUtils.normalize_action(file_entry.get("action"))
-                    source_path = bundle_data_dir / source_rel_path
-                    if not writer._path_exists_or_link(source_path):
-                        source_path = temp_install_dir / source_rel_path
-                    if not writer._path_exists_or_link(source_path):
-                        LOG.debug("Missing in bundle: %s", source_rel_path)
+                temp_install_dir: Optional[Path] = None
+                try:
+                    temp_install_dir = extractions[index].result()
+                    manifest_path = temp_install_dir / "manifest.toml"
+                    if not manifest_path.exists():
+                        UI.error(f"{pkg_path}: missing manifest.toml")
                         continue
-                    if entry_action == "tarball":
-                        if writer._extract_tarball_payload(source_path, destination_path, clean_target=clean_target):
-                            deployed_pairs.append({"src": source_rel_path, "dst": destination_path, "action": entry_action})
+                    with manifest_path.open("rb") as f:
+                        bundle = toml.load(f)
+                    prepared_bundle = self._prepare_bundle_install(bundle_path, bundle, dry_run=dry_run, uninstall_existing=uninstall_existing)
+                    if prepared_bundle is None:
                         continue
-                    if writer._copy_with_action(source_path, destination_path, entry_action, clean_target=clean_target):
-                        deployed_pairs.append({"src": source_rel_path, "dst": destination_path, "action": entry_action})
-                    elif entry_action == "preserve" and Path(destination_path).exists():
-                        adopted_pairs.append({"src": source_rel_path, "dst": destination_path, "action": entry_action})
-                if not deployed_pairs and not adopted_pairs:
-                    UI.info(f"'{dot}' skipped — no files installed.")
-                    continue
-                dot_post = bundle.get("post_command")
-                if dot_post:
-                    writer.execute_commands([dot_post])
-                copied_count = len(deployed_pairs)
-                adopted_count = len(adopted_pairs)
-                deployed_pairs.extend(adopted_pairs)
-                digest = hashlib.sha256(bundle_path.read_bytes()).hexdigest()
-                xdg_cache = Path(DeezUtils.xdg_cache_home())
-                cache_dir = xdg_cache / "deez" / "dots"
-                cache_dir.mkdir(parents=True, exist_ok=True)
-                cached_pkg = cache_dir / f"{digest}.tar.gz"
-                if not cached_pkg.exists():
-                    shutil.copy2(bundle_path, cached_pkg)
-                deployed_keys = {
-                    (
-                        str(e.get("src") or ""),
-                        os.path.normpath(str(e.get("dst") or "")),
-                    )
-                    for e in deployed_pairs
-                }
-                all_entries: List[Dict[str, Any]] = []
-                for file_entry in bundle_entries:
-                    entry_key = (
-                        str(file_entry.get("src") or ""),
-                        os.path.normpath(str(DeezUtils.expand(file_entry.get("dst")) or "")),
-                    )
-                    manifest_entry = {k: v for k, v in file_entry.items() if k != "installed"}
-                    manifest_entry["src"] = file_entry.get("src")
-                    manifest_entry["dst"] = file_entry.get("dst")
-                    manifest_entry["action"] = DeezUtils.normalize_action(file_entry.get("action"))
-                    manifest_entry["installed"] = entry_key in deployed_keys
-                    all_entries.append(manifest_entry)
-                directories: List[str] = []
-                seen_dirs = set()
-                for file_entry in bundle_entries:
-                    dst = file_entry.get("dst")
-                    if not dst:
+                    dot, bundle_entries, filtered_entries, _kept_pairs = prepared_bundle
+                    if self._skip_on_failed_pre_command(bundle.get("pre_command"), scope_label=f"dot '{dot}'"):
                         continue
-                    parent_dir = Path(dst).parent
-                    if parent_dir == Path(dst):
+                    install_entries: List[Dict[str, Any]] = []
+                    for file_entry in filtered_entries:
+                        if self._skip_on_failed_pre_command(file_entry.get("pre_command"), scope_label=self._file_entry_label(dot, file_entry)):
+                            continue
+                        install_entries.append(file_entry)
+                    filtered_entries = install_entries
+                    if not filtered_entries:
+                        UI.info(f"'{dot}' skipped — all file entries failed pre_command.")
                         continue
-                    dst_dir = str(parent_dir)
-                    if dst_dir not in seen_dirs:
-                        seen_dirs.add(dst_dir)
-                        directories.append(dst_dir)
-
-                meta = {k: v for k, v in bundle.items() if k != "files"}
-                if directories:
-                    meta["directories"] = directories
-                meta["hash"] = digest
-                meta["installdate"] = str(int(time.time()))
-                meta.pop("removeddate", None)
-                self.manifest_manager.save(dot, meta, all_entries)
-                skipped = len(bundle_entries) - len(deployed_pairs)
-                parts = []
-                if copied_count:
-                    parts.append(f"{copied_count} copied")
-                if adopted_count:
-                    parts.append(f"{adopted_count} adopted")
-                if skipped:
-                    parts.append(f"{skipped} skipped")
-                UI.success(f"Installed '{dot}': {', '.join(parts)}")
-            finally:
-                shutil.rmtree(temp_install_dir, ignore_errors=True)
+                    if not no_backup and dot not in self._backed_up_dots:
+                        installed_entries = self.manifest_manager.get_file_entries(dot)
+                        if installed_entries:
+                            backup_desc = self.manifest_manager.load_desc(dot) or {k: v for k, v in bundle.items() if k != "files"}
+                            backup_path = writer.backup_to_tarball(dot, installed_entries, desc_data=backup_desc)
+                        else:
+                            backup_desc = {k: v for k, v in bundle.items() if k != "files"}
+                            backup_path = writer.backup_to_tarball(dot, filtered_entries, desc_data=backup_desc)
+                        if backup_path:
+                            self._backed_up_dots.add(dot)
+                    if uninstall_existing and not dry_run:
+                        self._do_uninstall([dot], dry_run=False, confirm=False, remove_manifest=True)
+                    deployed_pairs: List[Dict[str, Any]] = []
+                    adopted_pairs: List[Dict[str, Any]] = []
+                    bundle_data_dir = temp_install_dir / "data"
+                    clean_target = bundle.get("clean_target", False)
+                    created_dirs: Set[Path] = set()
+                    for file_entry in filtered_entries:
+                        source_rel_path = file_entry.get("src")
+                        destination_path = DeezUtils.expand(file_entry.get("dst"))
+                        destination_path = os.path.normpath(str(destination_path)) if destination_path else ""
+                        entry_action = DeezUtils.normalize_action(file_entry.get("action"))
+                        source_path = bundle_data_dir / source_rel_path
+                        if not writer._path_exists_or_link(source_path):
+                            source_path = temp_install_dir / source_rel_path
+                        if not writer._path_exists_or_link(source_path):
+                            LOG.debug("Missing in bundle: %s", source_rel_path)
+                            continue
+                        if entry_action == "tarball":
+                            if writer._extract_tarball_payload(source_path, destination_path, clean_target=clean_target, created_dirs=created_dirs):
+                                deployed_pairs.append({"src": source_rel_path, "dst": destination_path, "action": entry_action})
+                            continue
+                        if writer._copy_with_action(source_path, destination_path, entry_action, clean_target=clean_target, created_dirs=created_dirs):
+                            deployed_pairs.append({"src": source_rel_path, "dst": destination_path, "action": entry_action})
+                        elif entry_action == "preserve" and Path(destination_path).exists():
+                            adopted_pairs.append({"src": source_rel_path, "dst": destination_path, "action": entry_action})
+                    if not deployed_pairs and not adopted_pairs:
+                        UI.info(f"'{dot}' skipped — no files installed.")
+                        continue
+                    dot_post = bundle.get("post_command")
+                    if dot_post:
+                        writer.execute_commands([dot_post])
+                    copied_count = len(deployed_pairs)
+                    adopted_count = len(adopted_pairs)
+                    deployed_pairs.extend(adopted_pairs)
+                    digest = hashlib.sha256(bundle_path.read_bytes()).hexdigest()
+                    xdg_cache = Path(DeezUtils.xdg_cache_home())
+                    cache_dir = xdg_cache / "deez" / "dots"
+                    cache_dir.mkdir(parents=True, exist_ok=True)
+                    cached_pkg = cache_dir / f"{digest}.tar.gz"
+                    if not cached_pkg.exists():
+                        shutil.copy2(bundle_path, cached_pkg)
+                    deployed_keys = {
+                        (
+                            str(e.get("src") or ""),
+                            os.path.normpath(str(e.get("dst") or "")),
+                        )
+                        for e in deployed_pairs
+                    }
+                    all_entries: List[Dict[str, Any]] = []
+                    for file_entry in bundle_entries:
+                        entry_key = (
+                            str(file_entry.get("src") or ""),
+                            os.path.normpath(str(DeezUtils.expand(file_entry.get("dst")) or "")),
+                        )
+                        manifest_entry = {k: v for k, v in file_entry.items() if k != "installed"}
+                        manifest_entry["src"] = file_entry.get("src")
+                        manifest_entry["dst"] = file_entry.get("dst")
+                        manifest_entry["action"] = DeezUtils.normalize_action(file_entry.get("action"))
+                        manifest_entry["installed"] = entry_key in deployed_keys
+                        all_entries.append(manifest_entry)
+                    directories: List[str] = []
+                    seen_dirs = set()
+                    for file_entry in bundle_entries:
+                        dst = file_entry.get("dst")
+                        if not dst:
+                            continue
+                        parent_dir = Path(dst).parent
+                        if parent_dir == Path(dst):
+                            continue
+                        dst_dir = str(parent_dir)
+                        if dst_dir not in seen_dirs:
+                            seen_dirs.add(dst_dir)
+                            directories.append(dst_dir)
+
+                    meta = {k: v for k, v in bundle.items() if k != "files"}
+                    if directories:
+                        meta["directories"] = directories
+                    meta["hash"] = digest
+                    meta["installdate"] = str(int(time.time()))
+                    meta.pop("removeddate", None)
+                    self.manifest_manager.save(dot, meta, all_entries)
+                    skipped = len(bundle_entries) - len(deployed_pairs)
+                    parts = []
+                    if copied_count:
+                        parts.append(f"{copied_count} copied")
+                    if adopted_count:
+                        parts.append(f"{adopted_count} adopted")
+                    if skipped:
+                        parts.append(f"{skipped} skipped")
+                    UI.success(f"Installed '{dot}': {', '.join(parts)}")
+                finally:
+                    extractions[index] = None
+                    if temp_install_dir is not None:
+                        shutil.rmtree(temp_install_dir, ignore_errors=True)
+        finally:
+            self._discard_bundle_extractions(extraction_pool, extractions)
 
     def _resolve_uninstall_targets(self, dots: Optional[List[str]], installed: List[str]) -> List[str]:
         if dots:
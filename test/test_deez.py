@@ -1,5 +1,7 @@
 
 import argparse
+import copy
+import errno
 import tempfile
 import shutil
 import hashlib
@@ -18,7 +20,7 @@ from importlib.machinery import SourceFileLoader
 from pathlib import Path
 from unittest.mock import patch
 from deez_dots.commands.dots import _should_overwrite_installed_dot
-from deez_dots.core import WriteDots, compare_versions
+from deez_dots.core import WriteDots, _path_executables, compare_versions
 
 # --- SAFETY FIX: Hijack environment BEFORE loading any deez modules ---
 # This prevents module-level constants in Deez from capturing the user's 
@@ -1268,6 +1270,41 @@ class TestDeezCLI(unittest.TestCase):
         self.assertEqual(loaded["global"]["version"], "0.1.0")
         self.assertEqual(loaded["kitty"]["paths"], [".config/kitty/kitty.conf"])
 
+    def test_read_meta_reuses_cached_parse_until_file_changes_and_replaces_stale_entry(self):
+        config_path = Path(self.tmpdir.name) / "cached.toml"
+        config_path.write_text('[global]\nversion = "0.1.0"\n')
+
+        with patch.dict(os.environ, {"XDG_CACHE_HOME": str(self.xdg_cache)}):
+            first = deez_module.ReadMeta().read_file(config_path)
+            with patch("deez_dots.core.toml.loads", side_effect=AssertionError("config should not be reparsed")):
+                second = deez_module.ReadMeta().read_file(config_path)
+            config_path.write_text('[global]\nversion = "0.2.0"\n')
+            third = deez_module.ReadMeta().read_file(config_path)
+
+        self.assertEqual(first, second)
+        self.assertIsNot(first, second)
+        self.assertEqual(third["global"]["version"], "0.2.0")
+        self.assertEqual(len(list((self.xdg_cache / "deez" / "parsed").glob("*.json"))), 1)
+        other_path = Path(self.tmpdir.name) / "other.toml"
+        other_path.write_text('[global]\nversion = "0.2.0"\n')
+        with patch.dict(os.environ, {"XDG_CACHE_HOME": str(self.xdg_cache)}):
+            deez_module.ReadMeta().read_file(other_path)
+        self.assertEqual(len(list((self.xdg_cache / "deez" / "parsed").glob("*.json"))), 2)
+
+    def test_read_meta_pickles_configs_that_json_cannot_represent(self):
+        config_path = Path(self.tmpdir.name) / "dated.toml"
+        config_path.write_text('[global]\nreleased = 2024-05-01T10:00:00Z\nratio = nan\n')
+
+        with patch.dict(os.environ, {"XDG_CACHE_HOME": str(self.xdg_cache)}):
+            first = deez_module.ReadMeta().read_file(config_path)
+            with patch("deez_dots.core.toml.loads", side_effect=AssertionError("config should not be reparsed")):
+                second = deez_module.ReadMeta().read_file(config_path)
+
+        parsed_dir = self.xdg_cache / "deez" / "parsed"
+        self.assertEqual(second["global"]["released"], first["global"]["released"])
+        self.assertEqual(list(parsed_dir.glob("*.json")), [])
+        self.assertEqual(len(list(parsed_dir.glob("*.pkl"))), 1)
+
     def test_read_meta_reports_missing_include_with_context(self):
         config_dir = Path(self.tmpdir.name) / "config-include-missing"
         config_dir.mkdir(parents=True, exist_ok=True)
@@ -1790,6 +1827,58 @@ class TestDeezCLI(unittest.TestCase):
         prepare_git_source.assert_called_once_with("https://github.com/HyDE-Project/HyDE.git", "main")
         self.assertEqual(captured["source_dir"], "/tmp/deez-git-source")
 
+    def test_prepare_git_source_clones_once_then_resets_to_fetched_ref(self):
+        calls = []
+
+        def fake_runner(cmd, **kwargs):
+            calls.append(cmd)
+            if cmd[1] == "clone":
+                Path(cmd[-1]).mkdir(parents=True)
+            return True, "", ""
+
+        handler = deez_module.GitHandler({}, runner=fake_runner)
+        with patch.dict(os.environ, self.env):
+            first = handler.prepare_git_source("https://github.com/HyDE-Project/HyDE.git", "dev")
+            second = handler.prepare_git_source("https://github.com/HyDE-Project/HyDE.git", "dev")
+
+        self.assertEqual(first, second)
+        self.assertEqual(
+            calls,
+            [
+                ["git", "clone", "--progress", "--depth", "1", "--single-branch", "--no-tags", "--branch", "dev", "https://github.com/HyDE-Project/HyDE.git", first],
+                ["git", "-C", first, "fetch", "--depth", "1", "--no-tags", "origin", "dev"],
+                ["git", "-C", first, "reset", "--hard", "FETCH_HEAD"],
+            ],
+        )
+
+    def test_git_and_package_commands_tolerate_runner_without_capture_stdout(self):
+        calls = []
+
+        def legacy_runner(cmd, shell=False, retries=3, capture_output=True, stream_output=False, passthrough_output=False):
+            calls.append(cmd)
+            if cmd[1] == "clone":
+                Path(cmd[-1]).mkdir(parents=True)
+            return True, "", ""
+
+        handler = deez_module.GitHandler({}, runner=legacy_runner)
+        with patch.dict(os.environ, self.env):
+            first = handler.prepare_git_source("https://github.com/HyDE-Project/HyDE.git", "dev")
+            handler.prepare_git_source("https://github.com/HyDE-Project/HyDE.git", "dev")
+
+        self.assertEqual([cmd[1] if cmd[1] == "clone" else cmd[3] for cmd in calls], ["clone", "fetch", "reset"])
+        self.assertEqual(calls[-1], ["git", "-C", first, "reset", "--hard", "FETCH_HEAD"])
+
+        package_calls = []
+
+        def legacy_package_runner(cmd, shell=False, retries=3, capture_output=True, stream_output=False, passthrough_output=False):
+            package_calls.append(cmd)
+            return True, "", ""
+
+        manager = deez_module.PackageManager(runner=legacy_package_runner)
+        with patch("deez_dots.core._on_path", return_value=True), redirect_stdout(io.StringIO()):
+            self.assertTrue(manager.install("pacman", ["kitty"]))
+        self.assertEqual(package_calls, ["sudo pacman -S kitty"])
+
     def test_is_file_source_url_accepts_github_blob_file_with_trailing_slash(self):
         url = "https://github.com/notofonts/noto-cjk/blob/main/Sans/OTC/NotoSansCJK-Regular.ttc/"
         self.assertTrue(deez_module.GitHandler.is_file_source_url(url))
@@ -2173,6 +2262,37 @@ class TestDeezCLI(unittest.TestCase):
         loaded_dirs = manager.get_directory_entries("kitty")
         self.assertEqual(loaded_dirs[0].get("dst"), directory)
 
+    def test_manifest_serializes_shell_hook_tables_inline(self):
+        manager = deez_module.ManifestManager()
+        manager.base_dir = str(Path(self.tmpdir.name) / "manifest")
+        hook = {"shell": "/bin/bash", "command": 'echo "hi"'}
+        manager.save(
+            "kitty",
+            {"name": "kitty", "post_command": hook},
+            [{"src": "kitty.conf", "dst": "${HOME}/.config/kitty/kitty.conf", "pre_command": hook}],
+        )
+        manifest_text = (Path(manager.base_dir) / "kitty.toml").read_text()
+        self.assertIn('post_command = { shell = "/bin/bash", command = "echo \\"hi\\"" }', manifest_text)
+        self.assertEqual(manager.load_desc("kitty").get("post_command"), hook)
+        self.assertEqual(manager.get_file_entries("kitty")[0].get("pre_command"), hook)
+
+    def test_manifest_round_trips_multiline_shell_hook(self):
+        manager = deez_module.ManifestManager()
+        manager.base_dir = str(Path(self.tmpdir.name) / "manifest")
+        hook = {"shell": "/bin/bash", "command": "set -e\nfor f in *.conf; do\n\techo \"$f\"\r\ndone\x7f\n"}
+        manager.save("kitty", {"name": "kitty", "post_command": hook}, [])
+
+        manifest_text = (Path(manager.base_dir) / "kitty.toml").read_text()
+        self.assertEqual(tomllib.loads(manifest_text)["post_command"], hook)
+        self.assertEqual(manager.load_desc("kitty").get("post_command"), hook)
+
+    def test_dry_run_pre_command_describes_shell_hook_tables(self):
+        output = io.StringIO()
+        with redirect_stdout(output):
+            deez_module.DeezCLI._announce_dry_run_pre_command({"shell": "/bin/bash", "command": "echo hi"}, scope_label="dot 'kitty'")
+        self.assertIn("pre_command: echo hi (via /bin/bash)", output.getvalue())
+        self.assertNotIn("{", output.getvalue())
+
     def test_writer_remove_prunes_empty_directories(self):
         manager = deez_module.ManifestManager()
         manager.base_dir = str(Path(self.tmpdir.name) / "manifest")
@@ -2230,6 +2350,18 @@ class TestDeezCLI(unittest.TestCase):
             result = deez_module.DeezUtils.expand_env("${XDG_CONFIG_HOME}/kitty.conf")
         self.assertEqual(result, str(self.home_dir / ".config" / "kitty.conf"))
 
+    def test_expand_env_uses_explicit_environment_without_touching_process_env(self):
+        env = {"HOME": "/srv/deez/", "XDG_CONFIG_HOME": "/srv/deez/.config"}
+        with patch.dict(os.environ, {"HOME": str(self.home_dir)}, clear=True):
+            result = deez_module.DeezUtils.expand_env(["~/bin", "${XDG_CONFIG_HOME}/kitty", "$UNSET/x"], env)
+            self.assertEqual(dict(os.environ), {"HOME": str(self.home_dir)})
+        self.assertEqual(result, ["/srv/deez/bin", "/srv/deez/.config/kitty", "$UNSET/x"])
+
+    def test_expand_env_skips_strings_without_variables_or_tilde(self):
+        with patch.object(deez_module.DeezUtils, "_expansion_env", side_effect=AssertionError("env built")):
+            self.assertEqual(deez_module.DeezUtils.expand_env("/etc/xdg/kitty.conf"), "/etc/xdg/kitty.conf")
+            self.assertEqual(deez_module.DeezUtils.expand_env("$HOME", {"HOME": "/srv"}), "/srv")
+
     def test_fetch_all_deps_includes_file_dependency_blocks(self):
         package_manager = deez_module.PackageManager(runner=lambda *args, **kwargs: (True, "", ""))
 
@@ -2251,6 +2383,42 @@ class TestDeezCLI(unittest.TestCase):
         self.assertEqual(deps["pacman"], ["hyprland", "nvidia-utils"])
         self.assertEqual(deps["dnf"], ["another-dependency"])
 
+    def test_fetch_all_deps_deduplicates_across_sections_without_mutating_config(self):
+        package_manager = deez_module.PackageManager(runner=lambda *args, **kwargs: (True, "", ""))
+        config = {
+            "global": {"dependency": [{"pacman": ["hyprland", "kitty"]}]},
+            "hyde": {"dependency": [{"pacman": ["kitty", "waybar"]}]},
+            "kitty": {"files": [{"paths": ["kitty.conf"], "dependency": [{"pacman": ["kitty"]}]}]},
+        }
+        original = copy.deepcopy(config)
+
+        deps = package_manager.fetch_all_deps(config)
+
+        self.assertEqual(deps, {"pacman": ["hyprland", "kitty", "waybar"]})
+        self.assertEqual(config, original)
+
+    def test_filter_deps_assigns_shared_packages_to_preferred_manager(self):
+        package_manager = deez_module.PackageManager(runner=lambda *args, **kwargs: (True, "", ""))
+
+        filtered = package_manager.filter_deps(
+            ["pacman", "yay", "flatpak"],
+            {
+                "yay,pacman": ["hyprland", "kitty"],
+                "yay": ["kitty", "hyde-cli"],
+                "dnf": ["another-dependency"],
+                "system": ["git"],
+            },
+        )
+
+        self.assertEqual(filtered, {"pacman": ["hyprland", "kitty"], "yay": ["hyde-cli"], "system": ["git"]})
+
+    def test_filter_deps_prefers_first_occurrence_of_repeated_manager(self):
+        package_manager = deez_module.PackageManager(runner=lambda *args, **kwargs: (True, "", ""))
+
+        filtered = package_manager.filter_deps(["yay", "pacman", "yay"], {"yay,pacman": ["hyprland"]})
+
+        self.assertEqual(filtered, {"yay": ["hyprland"]})
+
     def test_load_pm_parses_entries(self):
         custom_commands = deez_module.PackageManager.load_pm(
             {
@@ -2366,6 +2534,262 @@ class TestDeezCLI(unittest.TestCase):
         self.assertFalse(result)
         self.assertEqual(tgt_file.read_text(), "existing")
 
+    def test_write_dots_copy_file_falls_back_when_reflink_unsupported(self):
+        src_file = Path(self.tmpdir.name) / "src" / "kitty.conf"
+        tgt_file = Path(self.tmpdir.name) / "home" / "kitty.conf"
+        src_file.parent.mkdir(parents=True, exist_ok=True)
+        tgt_file.parent.mkdir(parents=True, exist_ok=True)
+        src_file.write_text("font_size 12\n")
+        os.chmod(src_file, 0o640)
+        os.utime(src_file, ns=(1_000_000_000, 1_000_000_000))
+
+        with patch("deez_dots.core.fcntl.ioctl", side_effect=OSError(errno.EOPNOTSUPP, "no reflink")), patch(
+            "deez_dots.core.os.copy_file_range", side_effect=OSError(errno.EXDEV, "cross device")
+        ):
+            WriteDots._copy_file(src_file, tgt_file)
+
+        self.assertEqual(tgt_file.read_text(), "font_size 12\n")
+        self.assertEqual(tgt_file.stat().st_mode & 0o777, 0o640)
+        self.assertEqual(tgt_file.stat().st_mtime_ns, 1_000_000_000)
+        with self.assertRaises(shutil.SameFileError):
+            WriteDots._copy_file(src_file, src_file)
+        self.assertEqual(src_file.read_text(), "font_size 12\n")
+
+    def test_write_dots_copy_file_works_without_fcntl_or_copy_file_range(self):
+        src_file = Path(self.tmpdir.name) / "src" / "foot.ini"
+        tgt_file = Path(self.tmpdir.name) / "home" / "foot.ini"
+        src_file.parent.mkdir(parents=True, exist_ok=True)
+        tgt_file.parent.mkdir(parents=True, exist_ok=True)
+        src_file.write_text("font=mono\n")
+        copy_file_range = getattr(os, "copy_file_range", None)
+
+        with patch("deez_dots.core.fcntl", None):
+            if copy_file_range is not None:
+                del os.copy_file_range
+            try:
+                WriteDots._copy_file(src_file, tgt_file)
+            finally:
+                if copy_file_range is not None:
+                    os.copy_file_range = copy_file_range
+
+        self.assertEqual(tgt_file.read_text(), "font=mono\n")
+
+    def test_write_dots_copy_file_rejects_named_pipes(self):
+        fifo = Path(self.tmpdir.name) / "src" / "pipe"
+        fifo.parent.mkdir(parents=True, exist_ok=True)
+        os.mkfifo(fifo)
+        regular = fifo.parent / "kitty.conf"
+        regular.write_text("font_size 12\n")
+
+        with self.assertRaises(shutil.SpecialFileError):
+            WriteDots._copy_file(fifo, fifo.parent / "copy")
+        with self.assertRaises(shutil.SpecialFileError):
+            WriteDots._copy_file(regular, fifo)
+        self.assertFalse((fifo.parent / "copy").exists())
+
+    def test_write_dots_copy_with_action_preserve_keeps_dangling_symlink_target(self):
+        writer = deez_module.WriteDots()
+        src_file = Path(self.tmpdir.name) / "src" / "file.txt"
+        tgt_file = Path(self.tmpdir.name) / "home" / "file.txt"
+        src_file.parent.mkdir(parents=True, exist_ok=True)
+        tgt_file.parent.mkdir(parents=True, exist_ok=True)
+        src_file.write_text("source")
+        os.symlink("missing.txt", tgt_file)
+
+        self.assertIsNone(writer._lstat_or_none(tgt_file.parent / "missing.txt"))
+        result = writer._copy_with_action(str(src_file), str(tgt_file), "preserve")
+
+        self.assertFalse(result)
+        self.assertTrue(tgt_file.is_symlink())
+        self.assertFalse((tgt_file.parent / "missing.txt").exists())
+
+    def test_write_dots_backup_path_to_stage_walks_tree_without_following_links(self):
+        src_dir = Path(self.tmpdir.name) / "src" / "kitty"
+        stage_dir = Path(self.tmpdir.name) / "stage" / "kitty"
+        (src_dir / "themes").mkdir(parents=True, exist_ok=True)
+        (src_dir / "kitty.conf").write_text("font_size 12")
+        (src_dir / "themes" / "dark.conf").write_text("background #000")
+        os.symlink("themes/dark.conf", src_dir / "current-theme.conf")
+        os.symlink("themes", src_dir / "themes-link")
+        os.chmod(src_dir / "themes", 0o555)
+
+        staged_files = WriteDots._backup_path_to_stage(src_dir, stage_dir)
+
+        self.assertEqual(
+            sorted(p.relative_to(stage_dir).as_posix() for p in staged_files),
+            ["current-theme.conf", "kitty.conf", "themes-link", "themes/dark.conf"],
+        )
+        self.assertEqual((stage_dir / "themes" / "dark.conf").read_text(), "background #000")
+        self.assertEqual(os.readlink(stage_dir / "current-theme.conf"), "themes/dark.conf")
+        self.assertTrue((stage_dir / "themes-link").is_symlink())
+        self.assertEqual((stage_dir / "themes").stat().st_mode & 0o777, 0o555)
+        self.assertEqual(WriteDots._backup_path_to_stage(src_dir / "missing", stage_dir / "missing"), [])
+
+    def test_write_dots_backup_path_to_stage_skips_named_pipes(self):
+        src_dir = Path(self.tmpdir.name) / "src" / "mpv"
+        stage_dir = Path(self.tmpdir.name) / "stage" / "mpv"
+        src_dir.mkdir(parents=True, exist_ok=True)
+        (src_dir / "mpv.conf").write_text("vo=gpu")
+        os.mkfifo(src_dir / "socket")
+
+        staged_files = WriteDots._backup_path_to_stage(src_dir, stage_dir)
+
+        self.assertEqual([p.relative_to(stage_dir).as_posix() for p in staged_files], ["mpv.conf"])
+        self.assertFalse(os.path.lexists(stage_dir / "socket"))
+
+    def test_write_dots_backup_reuses_snapshot_until_tracked_files_change(self):
+        local_dir = self.home_dir / ".local"
+        target = local_dir / "share" / "kitty" / "kitty.conf"
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text("font_size 12")
+        env = dict(self.env, XDG_DATA_HOME=str(local_dir / "share"))
+        writer = deez_module.WriteDots()
+        desc = {"owner": "hyde", "version": "1.0"}
+        timestamps = iter(["2026-01-01T00:00:01", "2026-01-01T00:00:02", "2026-01-01T00:00:03"])
+
+        with patch.dict(os.environ, env), redirect_stdout(io.StringIO()), patch.object(
+            deez_module.DeezUtils, "get_timestamp", side_effect=lambda: next(timestamps)
+        ):
+            first = writer.backup_to_tarball("kitty", [str(local_dir)], desc_data=desc)
+            second = writer.backup_to_tarball("kitty", [str(local_dir)], desc_data=desc)
+            os.utime(target, ns=(1_000_000_000, 1_000_000_000))
+            third = writer.backup_to_tarball("kitty", [str(local_dir)], desc_data=desc)
+
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, third)
+        self.assertEqual(len(list(Path(first).parent.glob("*.tar.gz"))), 2)
+        self.assertEqual((Path(third).parent / "latest.meta").read_text().split()[1], Path(third).name)
+        with tarfile.open(third, "r:gz") as tar:
+            members = tar.getnames()
+        self.assertIn(f"data/{target.relative_to(Path('/')).as_posix()}", members)
+        self.assertFalse(any("/deez/backup" in name for name in members))
+
+    def test_write_dots_backup_continues_when_tracked_subdir_is_unreadable(self):
+        kitty_dir = self.home_dir / ".config" / "kitty"
+        locked_dir = kitty_dir / "private"
+        locked_dir.mkdir(parents=True, exist_ok=True)
+        (locked_dir / "secret.conf").write_text("token")
+        foot_file = self.home_dir / ".config" / "foot" / "foot.ini"
+        foot_file.parent.mkdir(parents=True, exist_ok=True)
+        foot_file.write_text("font=mono")
+        writer = deez_module.WriteDots()
+        timestamps = iter(["2026-01-01T00:00:01", "2026-01-01T00:00:02"])
+        original_scandir = os.scandir
+
+        def guarded_scandir(path="."):
+            if not isinstance(path, int) and os.fsdecode(path) == str(locked_dir):
+                raise PermissionError(errno.EACCES, "Permission denied", os.fsdecode(path))
+            return original_scandir(path)
+
+        with patch.dict(os.environ, self.env), redirect_stdout(io.StringIO()), patch.object(
+            deez_module.DeezUtils, "get_timestamp", side_effect=lambda: next(timestamps)
+        ), patch("deez_dots.core.os.scandir", side_effect=guarded_scandir), self.assertLogs("deez-dots", level="WARNING") as logs:
+            first = writer.backup_to_tarball("kitty", [str(kitty_dir), str(foot_file)], desc_data={})
+            second = writer.backup_to_tarball("kitty", [str(kitty_dir), str(foot_file)], desc_data={})
+
+        self.assertTrue(first and second)
+        self.assertNotEqual(first, second)
+        self.assertTrue(any("Backup failed for" in line for line in logs.output))
+        self.assertFalse((Path(first).parent / "latest.meta").exists())
+        with tarfile.open(first, "r:gz") as tar:
+            self.assertIn(f"data/{foot_file.relative_to(Path('/')).as_posix()}", tar.getnames())
+
+    def test_write_dots_copy_with_action_creates_each_parent_once(self):
+        src_dir = Path(self.tmpdir.name) / "src"
+        tgt_dir = self.home_dir / ".config" / "kitty"
+        src_dir.mkdir(parents=True, exist_ok=True)
+        for name in ("kitty.conf", "theme.conf", "keys.conf"):
+            (src_dir / name).write_text(name)
+        created_dirs = set()
+        mkdir_calls = []
+        original_mkdir = Path.mkdir
+
+        def counting_mkdir(path, *args, **kwargs):
+            if kwargs.get("parents"):
+                mkdir_calls.append(path)
+            return original_mkdir(path, *args, **kwargs)
+
+        with patch.object(Path, "mkdir", counting_mkdir):
+            for name in ("kitty.conf", "theme.conf", "keys.conf"):
+                self.assertTrue(WriteDots._copy_with_action(src_dir / name, tgt_dir / name, "sync", created_dirs=created_dirs))
+
+        self.assertEqual(mkdir_calls.count(tgt_dir), 1)
+        self.assertEqual(created_dirs, {tgt_dir})
+        self.assertEqual((tgt_dir / "keys.conf").read_text(), "keys.conf")
+
+    def test_write_dots_clean_tarball_extraction_forgets_cached_parents(self):
+        writer = deez_module.WriteDots()
+        src_dir = Path(self.tmpdir.name) / "src"
+        src_dir.mkdir(parents=True, exist_ok=True)
+        (src_dir / "a.conf").write_text("a")
+        (src_dir / "b.conf").write_text("b")
+        (src_dir / "hyprland.conf").write_text("hypr")
+        archive = src_dir / "hypr.tar.gz"
+        with tarfile.open(archive, "w:gz") as tar:
+            tar.add(src_dir / "hyprland.conf", arcname="hyprland.conf")
+        hypr_dir = self.home_dir / ".config" / "hypr"
+        created_dirs = set()
+
+        self.assertTrue(writer._copy_with_action(src_dir / "a.conf", hypr_dir / "sub" / "a.conf", "sync", created_dirs=created_dirs))
+        self.assertTrue(writer._extract_tarball_payload(archive, hypr_dir, clean_target=True, created_dirs=created_dirs))
+        self.assertTrue(writer._copy_with_action(src_dir / "b.conf", hypr_dir / "sub" / "b.conf", "sync", created_dirs=created_dirs))
+
+        self.assertEqual((hypr_dir / "sub" / "b.conf").read_text(), "b")
+        self.assertEqual((hypr_dir / "hyprland.conf").read_text(), "hypr")
+        self.assertFalse((hypr_dir / "sub" / "a.conf").exists())
+
+    def test_write_dots_copy_with_action_merges_into_existing_directory(self):
+        src_dir = Path(self.tmpdir.name) / "src"
+        tgt_dir = self.home_dir / ".config" / "kitty"
+        (src_dir / "thèmes").mkdir(parents=True, exist_ok=True)
+        (src_dir / "kitty.conf").write_text("new")
+        (src_dir / "thèmes" / "dark.conf").write_text("dark")
+        (tgt_dir / "thèmes").mkdir(parents=True, exist_ok=True)
+        (tgt_dir / "kitty.conf").write_text("old")
+        (tgt_dir / "thèmes" / "dark.conf").write_text("mine")
+        (tgt_dir / "local.conf").write_text("local")
+
+        self.assertTrue(WriteDots._copy_with_action(src_dir, tgt_dir, "preserve"))
+        self.assertEqual((tgt_dir / "kitty.conf").read_text(), "old")
+        self.assertEqual((tgt_dir / "thèmes" / "dark.conf").read_text(), "mine")
+
+        self.assertTrue(WriteDots._copy_with_action(src_dir, tgt_dir, "sync"))
+        self.assertEqual((tgt_dir / "kitty.conf").read_text(), "new")
+        self.assertEqual((tgt_dir / "thèmes" / "dark.conf").read_text(), "dark")
+        self.assertEqual((tgt_dir / "local.conf").read_text(), "local")
+
+    def test_write_dots_backup_stages_top_level_entries_concurrently_in_order(self):
+        kitty_dir = self.home_dir / ".config" / "kitty"
+        waybar_conf = self.home_dir / ".config" / "waybar" / "config"
+        bashrc = self.home_dir / ".bashrc"
+        kitty_dir.mkdir(parents=True, exist_ok=True)
+        waybar_conf.parent.mkdir(parents=True, exist_ok=True)
+        (kitty_dir / "kitty.conf").write_text("font_size 12")
+        waybar_conf.write_text("{}")
+        bashrc.write_text("export EDITOR=vim")
+        entries = [
+            str(waybar_conf),
+            {"dst": str(kitty_dir), "action": "sync"},
+            {"dst": str(kitty_dir / "kitty.conf"), "action": "preserve"},
+            str(bashrc),
+        ]
+
+        with patch.dict(os.environ, self.env), redirect_stdout(io.StringIO()):
+            tarball = deez_module.WriteDots().backup_to_tarball("hyde", entries, desc_data={"owner": "hyde", "version": "1.0"})
+
+        with tarfile.open(tarball, "r:gz") as tar:
+            manifest = tomllib.loads(tar.extractfile("manifest.toml").read().decode("utf-8"))
+        home_rel = self.home_dir.relative_to(Path("/")).as_posix()
+        self.assertEqual(
+            [(entry["src"], entry["action"]) for entry in manifest["files"]],
+            [
+                (f"{home_rel}/.config/waybar/config", "sync"),
+                (f"{home_rel}/.config/kitty/kitty.conf", "sync"),
+                (f"{home_rel}/.config/kitty/kitty.conf", "preserve"),
+                (f"{home_rel}/.bashrc", "sync"),
+            ],
+        )
+
     def test_write_dots_copy_with_action_preserves_symlink(self):
         writer = deez_module.WriteDots()
         src_dir = Path(self.tmpdir.name) / "src-link"
@@ -2851,6 +3275,44 @@ class TestDeezCLI(unittest.TestCase):
         self.assertEqual(order[1][0], "package")
         self.assertEqual(order[2], ("install", True))
 
+    def test_check_dependency_status_uses_cached_listings_across_managers(self):
+        calls = []
+        listings = {"pacman -Qq": "kitty\n", "yay -Qq": "kitty\nhyprland-git\n"}
+
+        def fake_runner(cmd, **kwargs):
+            cmd = " ".join(cmd)
+            calls.append(cmd)
+            return True, listings.get(cmd, ""), ""
+
+        with patch.dict(os.environ, self.env, clear=False):
+            cli = self._make_cli({"global": {}})
+        cli.available_package_managers = ["pacman", "yay"]
+        cli.package_manager_instance = deez_module.PackageManager(runner=fake_runner)
+
+        with patch("deez_dots.core._on_path", return_value=True), redirect_stdout(io.StringIO()):
+            satisfied, missing = cli._check_dependency_status({"pacman": ["kitty", "hyprland-git", "foot"]})
+
+        self.assertEqual(satisfied, {"pacman": ["kitty", "hyprland-git"]})
+        self.assertEqual(missing, {"pacman": ["foot"]})
+        self.assertEqual(sorted(calls), ["pacman -Qq", "yay -Qq"])
+
+    def test_check_dependency_status_falls_back_to_other_required_managers(self):
+        listings = {"pacman -Qq": "kitty\n", "flatpak list --app --columns=application": "org.foo.App\norg.bar\n"}
+
+        def fake_runner(cmd, **kwargs):
+            return True, listings.get(" ".join(cmd), ""), ""
+
+        with patch.dict(os.environ, self.env, clear=False):
+            cli = self._make_cli({"global": {}})
+        cli.available_package_managers = ["pacman", "flatpak"]
+        cli.package_manager_instance = deez_module.PackageManager(runner=fake_runner)
+
+        with patch("deez_dots.core._on_path", return_value=True), redirect_stdout(io.StringIO()):
+            satisfied, missing = cli._check_dependency_status({"pacman": ["org.foo.App", "foot"], "flatpak": ["org.bar", "kitty-flatpak"]})
+
+        self.assertEqual(satisfied, {"pacman": ["org.foo.App"], "flatpak": ["org.bar"]})
+        self.assertEqual(missing, {"pacman": ["foot"], "flatpak": ["kitty-flatpak"]})
+
     def test_dots_package_warns_on_missing_sources_and_continues(self):
         source_dir = Path(self.tmpdir.name) / "source"
         config_file = source_dir / "Configs/.config/kitty/kitty.conf"
@@ -2969,6 +3431,17 @@ class TestDeezCLI(unittest.TestCase):
         self.assertEqual(out, "")
         self.assertEqual(err, "boom")
 
+    def test_default_run_command_can_discard_stdout(self):
+        success, out, err = deez_module.default_run_command(
+            [sys.executable, "-c", "import sys; print('noise' * 1000); sys.stderr.write('failed'); sys.exit(2)"],
+            capture_stdout=False,
+            retries=1,
+        )
+
+        self.assertFalse(success)
+        self.assertEqual(out, "")
+        self.assertEqual(err, "failed")
+
     def test_default_run_command_streams_live_output(self):
         output = io.StringIO()
 
@@ -3015,10 +3488,34 @@ class TestDeezCLI(unittest.TestCase):
         writer = deez_module.WriteDots(runner=fake_runner)
         writer.execute_commands(["echo ok"])
 
-        self.assertEqual(calls[0][0], "echo ok")
+        self.assertEqual(calls[0][0], ["echo", "ok"])
+        self.assertNotIn("shell", calls[0][1])
         self.assertTrue(calls[0][1].get("stream_output"))
         self.assertTrue(calls[0][1].get("passthrough_output"))
 
+    def test_write_dots_execute_commands_uses_shell_only_when_needed(self):
+        calls = []
+
+        def fake_runner(cmd, **kwargs):
+            calls.append((cmd, kwargs))
+            return True, "", ""
+
+        writer = deez_module.WriteDots(runner=fake_runner)
+        writer.execute_commands(
+            [
+                "echo $HOME | tee out.txt",
+                "cd build",
+                {"shell": "/bin/bash", "command": "echo {a,b}"},
+            ]
+        )
+
+        self.assertEqual(calls[0][0], "echo $HOME | tee out.txt")
+        self.assertTrue(calls[0][1]["shell"])
+        self.assertEqual(calls[1][0], "cd build")
+        self.assertTrue(calls[1][1]["shell"])
+        self.assertEqual(calls[2][0], ["/bin/bash", "-c", "echo {a,b}"])
+        self.assertNotIn("shell", calls[2][1])
+
     def test_package_manager_update_primes_sudo_and_streams_live_output(self):
         calls = []
 
@@ -3047,6 +3544,96 @@ class TestDeezCLI(unittest.TestCase):
 
         mocked_loader_message.assert_called_once_with("Installing via pacman: kitty")
 
+    def test_package_manager_query_installed_lists_packages_once(self):
+        calls = []
+
+        def fake_runner(cmd, **kwargs):
+            calls.append((cmd, kwargs))
+            return True, "kitty\nhyprland\n", ""
+
+        manager = deez_module.PackageManager(runner=fake_runner)
+
+        self.assertTrue(manager.query_installed("pacman", "kitty"))
+        self.assertTrue(manager.query_installed("pacman", "hyprland"))
+        self.assertFalse(manager.query_installed("pacman", "kitty-terminfo"))
+        self.assertEqual(calls, [(["pacman", "-Qq"], {"retries": 1})])
+
+    def test_package_manager_list_command_honors_shell_quoting(self):
+        calls = []
+
+        def fake_runner(cmd, **kwargs):
+            calls.append((cmd, kwargs))
+            return True, "kitty\nfoot\n", ""
+
+        manager = deez_module.PackageManager(
+            runner=fake_runner,
+            custom_commands={"dnf": {"list": "dnf repoquery --installed --qf '%{name}\\n'"}, "pkg": {"list": "pkg info --quiet"}},
+        )
+
+        self.assertEqual(manager.installed_packages("dnf"), frozenset({"kitty", "foot"}))
+        self.assertEqual(manager.installed_packages("pkg"), frozenset({"kitty", "foot"}))
+        self.assertEqual(
+            calls,
+            [
+                ("dnf repoquery --installed --qf '%{name}\\n'", {"shell": True, "retries": 1}),
+                (["pkg", "info", "--quiet"], {"retries": 1}),
+            ],
+        )
+
+    def test_package_manager_install_refreshes_path_snapshot(self):
+        manager = deez_module.PackageManager(runner=lambda *args, **kwargs: (True, "", ""))
+        _path_executables(tuple(os.get_exec_path()))
+
+        with patch("deez_dots.core._on_path", return_value=True), redirect_stdout(io.StringIO()):
+            self.assertTrue(manager.install("pacman", ["kitty"]))
+
+        self.assertEqual(_path_executables.cache_info().currsize, 0)
+
+    def test_package_manager_query_installed_parses_apt_listing(self):
+        output = "adduser/now 3.134 all [installed,local]\nkitty/stable,now 0.26.5-5 amd64 [installed]\n"
+        manager = deez_module.PackageManager(runner=lambda *args, **kwargs: (True, output, ""))
+
+        self.assertEqual(manager.installed_packages("apt"), frozenset({"adduser", "kitty"}))
+
+    def test_package_manager_flatpak_query_filters_listing_in_process(self):
+        calls = []
+
+        def fake_runner(cmd, **kwargs):
+            calls.append((cmd, kwargs))
+            return True, "org.mozilla.firefox\ncom.valvesoftware.Steam\n", ""
+
+        manager = deez_module.PackageManager(runner=fake_runner)
+
+        self.assertTrue(manager.query_installed("flatpak", "org.mozilla.firefox"))
+        self.assertFalse(manager.query_installed("flatpak", "org.mozilla"))
+        self.assertEqual(calls, [(["flatpak", "list", "--app", "--columns=application"], {"retries": 1})])
+        self.assertNotIn("|", manager.package_manager_commands["flatpak"]["query"])
+
+    def test_available_managers_scans_path_for_executables(self):
+        bin_dir = Path(self.tmpdir.name) / "bin"
+        bin_dir.mkdir()
+        for name, mode in (("pacman", 0o755), ("flatpak", 0o644)):
+            executable = bin_dir / name
+            executable.write_text("#!/bin/sh\n")
+            executable.chmod(mode)
+
+        with patch.dict(os.environ, {"PATH": str(bin_dir)}):
+            manager = deez_module.PackageManager(runner=lambda *args, **kwargs: (True, "", ""))
+
+        self.assertEqual(manager.available, ["pacman"])
+
+    def test_package_manager_custom_query_disables_default_listing(self):
+        calls = []
+
+        def fake_runner(cmd, **kwargs):
+            calls.append(cmd)
+            return True, "kitty 0.1\n", ""
+
+        manager = deez_module.PackageManager(runner=fake_runner, custom_commands={"pacman": {"query": "pacman -Q"}})
+
+        self.assertTrue(manager.query_installed("pacman", "kitty"))
+        self.assertEqual(calls, [["pacman", "-Q", "kitty"]])
+
     def test_command_modules_are_importable_for_interop(self):
         self.assertEqual(list(command_modules.COMMAND_MODULES.keys()), ["dots", "deps", "backup", "cache"])
         self.assertEqual(command_modules.DOTS_COMMAND.description, "Dotfile deployment operations")
@@ -3557,9 +4144,9 @@ class TestDeezCLI(unittest.TestCase):
 
             original_copy = deez_module.WriteDots._copy_with_action
 
-            def wrapped_copy(src_path, tgt_path, action, clean_target=False):
+            def wrapped_copy(src_path, tgt_path, action, clean_target=False, **kwargs):
                 order.append(("copy", str(tgt_path)))
-                return original_copy(src_path, tgt_path, action, clean_target=clean_target)
+                return original_copy(src_path, tgt_path, action, clean_target=clean_target, **kwargs)
 
             cli.package_manager_instance.query_installed = fake_query_installed
             cli.package_manager_instance.install_packages = fake_install_packages
@@ -3607,6 +4194,38 @@ class TestDeezCLI(unittest.TestCase):
         self.assertIn("[warn] pacman: nvidia-utils missing", text)
         self.assertIn("Installing via pacman: nvidia-utils", text)
 
+    def test_dots_install_extracts_multiple_bundles_and_cleans_up(self):
+        bundle_paths = [
+            self._make_bundle_tarball(
+                Path(self.tmpdir.name) / f"{name}.tar.gz",
+                name=name,
+                owner="hyde_project",
+                version="1.0",
+                files=[{"src": f"Configs/.config/{name}/{name}.conf", "dst": f"{self.home_dir}/.config/{name}/{name}.conf", "action": "sync", "content": name}],
+            )
+            for name in ("kitty", "waybar")
+        ]
+        extract_root = Path(self.tmpdir.name) / "extract"
+        extract_root.mkdir()
+        real_mkdtemp = tempfile.mkdtemp
+        created_dirs = []
+
+        def tracking_mkdtemp(*args, **kwargs):
+            kwargs["dir"] = str(extract_root)
+            created_dirs.append(real_mkdtemp(*args, **kwargs))
+            return created_dirs[-1]
+
+        with patch.dict(os.environ, self.env, clear=False):
+            cli = self._make_cli({"global": {}}, source_dir=self.home_dir)
+            cli.args = argparse.Namespace(no_backup=True, no_deps_checks=True, no_deps_install=False)
+            with patch("deez_dots.core.tempfile.mkdtemp", side_effect=tracking_mkdtemp), redirect_stdout(io.StringIO()):
+                cli._do_install([str(path) for path in bundle_paths], prechecked_dependencies=True)
+
+        self.assertEqual((self.home_dir / ".config/kitty/kitty.conf").read_text(), "kitty")
+        self.assertEqual((self.home_dir / ".config/waybar/waybar.conf").read_text(), "waybar")
+        self.assertEqual(len([d for d in created_dirs if "deez-install-" in d]), 2)
+        self.assertEqual(list(extract_root.iterdir()), [])
+
     def test_dots_install_honors_file_level_dependency_from_bundle_manifest(self):
         bundle_path = self._make_bundle_tarball(
             Path(self.tmpdir.name) / "kitty-theme-deps.tar.gz",